@@ -1,17 +1,14 @@
+import re
 import streamlit as st
+import uuid
 from datetime import datetime
-import re
 
-from src.analyzer import CodeAnalyzer
-from src.rules import CodeReviewRules
-from src.rewriter import CodeRewriter
-from src.llm_reviewer import LLMCodeReviewer
+from src.history import BUILD, GENERATION, REVIEW, get_history_store
+from src.incremental import IncrementalAnalysisCache
+from src.service import CoderBuddyService, is_python_request
 
-from src.project_builder.blueprint import ProjectBlueprintGenerator
-from src.project_builder.planner import ProjectPlanner
-from src.project_builder.generator import ProjectCodeGenerator
-from src.project_builder.formatter import ProjectFormatter
-from src.project_builder.zipper import ProjectZipper
+# The LLM client, batch and project-builder modules are imported on
+# first use (see src.service), keeping cold starts cheap for local reviews
 
 # ==================================================
 # PAGE CONFIG
@@ -25,43 +22,226 @@ st.set_page_config(
 # ==================================================
 # SESSION STATE
 # ==================================================
-if "review_history" not in st.session_state:
-    st.session_state.review_history = []
+if "replay_id" not in st.session_state:
+    st.session_state.replay_id = None
+
+# History is stored on disk and scoped to an owner id kept in the URL
+# (?owner=...), so it survives reloads and bookmarks while other
+# visitors cannot see it. Anyone given the full URL shares the history.
+if "history_owner" not in st.session_state:
+    owner = st.query_params.get("owner", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", owner):
+        owner = uuid.uuid4().hex
+        st.query_params["owner"] = owner
+    st.session_state.history_owner = owner
+
+if "analysis_cache" not in st.session_state:
+    st.session_state.analysis_cache = IncrementalAnalysisCache()
+
+# ==================================================
+# CACHED RESOURCES (SHARED ACROSS RERUNS AND SESSIONS)
+# ==================================================
+@st.cache_resource(show_spinner=False)
+def get_llm_service(api_key: str) -> CoderBuddyService:
+    """
+    Service for the LLM-backed generation and build flows.
+    """
+    return CoderBuddyService(api_key)
 
-if "code_gen_history" not in st.session_state:
-    st.session_state.code_gen_history = []
 
-if "project_build_history" not in st.session_state:
-    st.session_state.project_build_history = []
+@st.cache_resource(show_spinner=False)
+def get_batch_executor():
+    """
+    Warm worker processes reused by every batch review.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor()
 
 # ==================================================
 # HELPER FUNCTIONS
 # ==================================================
-def is_python_request(text: str) -> bool:
+def iter_uploaded_sources(uploads):
+    """
+    Yield (name, source) pairs from uploaded .zip / .py files.
     """
-    Word-boundary safe Python-only validation.
+    from src.batch_review import iter_zip_sources
+
+    for upload in uploads:
+        if upload.name.endswith(".zip"):
+            yield from iter_zip_sources(upload)
+        else:
+            yield upload.name, upload.getvalue().decode("utf-8", errors="replace")
+
+
+def render_timing_panel(timing, blueprint_cache=None):
+    """
+    Expandable per-stage / per-file timing and token usage panel.
     """
-    text = text.lower()
-    non_python_languages = [
-        "c program", "c language", "c++",
-        "java", "javascript", "js",
-        "php", "ruby",
-        "go language", "golang",
-        "rust", "kotlin", "swift"
-    ]
-    for lang in non_python_languages:
-        if re.search(rf"\b{re.escape(lang)}\b", text):
-            return False
-    return True
-
-
-def calculate_quality_score(analysis, feedback):
-    score = 100
-    score -= sum(1 for f in feedback if f.startswith("❌")) * 20
-    score -= sum(1 for f in feedback if f.startswith("⚠️")) * 10
-    score -= sum(1 for f in feedback if f.startswith("ℹ️")) * 5
-    score -= analysis["loops"] * 5
-    return max(score, 0)
+    with st.expander(f"⏱️ Build Timing ({timing['total_seconds']:.1f}s)"):
+        if blueprint_cache:
+            status = (
+                f"hit, saved {blueprint_cache['saved_seconds']:.1f}s"
+                if blueprint_cache["hit"] else "miss"
+            )
+            st.caption(
+                f"Blueprint cache: {status} · hit rate "
+                f"{blueprint_cache.get('hit_rate', 0):.0%} · "
+                f"{blueprint_cache.get('total_saved_seconds', 0):.1f}s saved in total"
+            )
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("LLM Calls", timing["llm_calls"])
+        c2.metric("Cache Hits", timing["cache_hits"])
+        c3.metric("Retries", timing["retries"])
+        c4.metric(
+            "Tokens (prompt / completion)",
+            f"{timing['prompt_tokens']} / {timing['completion_tokens']}"
+        )
+
+        st.markdown("**Stages (seconds)**")
+        st.table([{"stage": k, "seconds": v} for k, v in timing["stages"].items()])
+
+        st.markdown("**Files (seconds)**")
+        st.table([{"file": k, "seconds": v} for k, v in timing["files"].items()])
+
+        from src.metrics import stage_percentiles
+
+        history = stage_percentiles()
+        if history:
+            st.markdown("**History (p50 / p95 seconds)**")
+            st.table([{"stage": k, **v} for k, v in history.items()])
+
+
+def render_review(code, review, llm_review=None, llm_stream=None):
+    """
+    Review tabs; the LLM tab shows a stored review or streams a new
+    one. Returns the LLM review text, if any.
+    """
+    tabs = st.tabs(["🧾 Review", "⭐ Score", "✨ Rewrite", "🤖 LLM"])
+
+    with tabs[0]:
+        for f in review["feedback"]:
+            st.write(f)
+
+    with tabs[1]:
+        st.metric("Code Quality Score", f"{review['score']}/100")
+
+    with tabs[2]:
+        c1, c2 = st.columns(2)
+        c1.code(code, language="python")
+        c2.code(review["rewritten"], language="python")
+
+    with tabs[3]:
+        if llm_review:
+            st.markdown(llm_review)
+        elif llm_stream is not None:
+            return st.write_stream(llm_stream)
+        else:
+            st.info("Enter API key to enable LLM review")
+    return llm_review
+
+
+def render_generation(code, explanation):
+    st.code(code, language="python")
+    st.markdown("### 📘 Explanation")
+    st.write(explanation)
+
+
+def render_file(name, content, problem=None):
+    with st.expander(f"⚠️ {name}" if problem else name):
+        if problem:
+            st.warning(f"Failed validation ({problem})")
+        if name.endswith(".md"):
+            st.markdown(content)
+        else:
+            st.code(content, language="python")
+
+
+def render_build(blueprint, files, failures, timing, zip_data, blueprint_cache=None, problems=None):
+    if failures:
+        for name, error in failures.items():
+            st.warning(f"⚠️ Failed to generate {name}: {error}")
+    else:
+        st.success("✅ Project generated successfully!")
+
+    st.subheader("▶️ How to Run This Project")
+    if blueprint["interaction_mode"] == "cli":
+        st.code("python main.py", language="bash")
+    else:
+        st.code("streamlit run app.py", language="bash")
+
+    st.subheader("📁 Generated Files")
+    for name, content in files.items():
+        render_file(name, content, (problems or {}).get(name))
+
+    if timing:
+        render_timing_panel(timing, blueprint_cache)
+
+    st.download_button(
+        "⬇️ Download Project (ZIP)",
+        zip_data,
+        file_name=f"{blueprint['project_name']}.zip",
+        mime="application/zip"
+    )
+
+
+def render_replay(entry_id):
+    """
+    Re-render a stored history entry without calling the LLM.
+    """
+    entry = get_history_store().get(entry_id, owner=st.session_state.history_owner)
+    if entry is None:
+        st.warning("This history entry has expired.")
+        return
+
+    when = datetime.fromtimestamp(entry["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    st.caption(f"🕘 Replaying {entry['mode']} from {when}")
+    artifact = entry["artifact"]
+
+    if entry["mode"] == REVIEW:
+        render_review(artifact["code"], artifact["review"], artifact.get("llm_review"))
+    elif entry["mode"] == GENERATION:
+        st.markdown(f"**Request:** {artifact['request']}")
+        render_generation(artifact["code"], artifact["explanation"])
+    else:
+        from src.project_builder.zipper import ProjectZipper
+
+        # Archives are reproducible, so the ZIP is rebuilt from the files
+        blueprint = artifact["blueprint"]
+        zip_data = ProjectZipper().create_zip(blueprint["project_name"], artifact["files"])
+        render_build(
+            blueprint, artifact["files"], artifact["failures"], None, zip_data.read(),
+            problems=artifact.get("problems")
+        )
+
+
+def render_history_section(title, mode, empty_text, label):
+    """
+    Paginated, clickable sidebar list of stored history entries.
+    """
+    st.sidebar.subheader(title)
+    store = get_history_store()
+    owner = st.session_state.history_owner
+    total = store.count(mode, owner=owner)
+    if not total:
+        st.sidebar.caption(empty_text)
+        return
+
+    pages = -(-total // HISTORY_PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        page = st.sidebar.number_input(
+            f"Page (of {pages})", min_value=1, max_value=pages, key=f"history_page_{mode}"
+        )
+
+    for entry in store.list(mode, page - 1, HISTORY_PAGE_SIZE, owner=owner):
+        when = datetime.fromtimestamp(entry["created_at"]).strftime("%m-%d %H:%M")
+        if st.sidebar.button(f"{when} → {label(entry)}", key=f"history_{entry['id']}"):
+            st.session_state.replay_id = entry["id"]
+
+
+MAX_BATCH_EXPANDERS = 100
+HISTORY_PAGE_SIZE = 5
 
 # ==================================================
 # SIDEBAR
@@ -71,38 +251,37 @@ api_key = st.sidebar.text_input("Enter LLM API Key", type="password")
 
 st.sidebar.markdown("---")
 
-st.sidebar.subheader("🧾 Code Review History")
-if st.session_state.review_history:
-    for h in st.session_state.review_history:
-        st.sidebar.write(f"{h['time']} → {h['score']}/100")
-else:
-    st.sidebar.caption("No reviews yet")
+render_history_section(
+    "🧾 Code Review History", REVIEW, "No reviews yet",
+    lambda h: f"{h['score']}/100"
+)
 
 st.sidebar.markdown("---")
 
-st.sidebar.subheader("✨ Code Generation History")
-if st.session_state.code_gen_history:
-    for h in st.session_state.code_gen_history:
-        st.sidebar.write(f"{h['time']} → {h['prompt'][:30]}...")
-else:
-    st.sidebar.caption("No generations yet")
+render_history_section(
+    "✨ Code Generation History", GENERATION, "No generations yet",
+    lambda h: f"{h['title'][:30]}..."
+)
 
 st.sidebar.markdown("---")
 
-st.sidebar.subheader("🧩 Mini Project History")
-if st.session_state.project_build_history:
-    for h in st.session_state.project_build_history:
-        st.sidebar.write(
-            f"{h['time']} → {h['project']} ({h['mode']})"
-        )
-else:
-    st.sidebar.caption("No projects yet")
+render_history_section(
+    "🧩 Mini Project History", BUILD, "No projects yet",
+    lambda h: f"{h['project_name']} ({h['meta'].get('interaction_mode', '').upper()})"
+)
 
 # ==================================================
 # MAIN UI
 # ==================================================
 st.title("🤖 Coder Buddy - Agentic AI Application")
 
+if st.session_state.replay_id is not None:
+    if st.button("✖ Close History Entry"):
+        st.session_state.replay_id = None
+        st.rerun()
+    render_replay(st.session_state.replay_id)
+    st.stop()
+
 mode = st.radio(
     "Select Mode",
     ["🔍 Code Review", "✨ Code Generation", "🧩 Mini Project Builder"],
@@ -117,45 +296,93 @@ st.divider()
 if mode == "🔍 Code Review":
     st.subheader("🧾 Python Code Review")
 
-    with st.form("review_form"):
-        code = st.text_area("Paste Python Code", height=280)
-        submit = st.form_submit_button("🔍 Review Code", use_container_width=True)
-
-    if submit and code.strip():
-        analyzer = CodeAnalyzer(code)
-        analysis = analyzer.run()
-
-        rules = CodeReviewRules(analysis)
-        feedback = rules.run_all()
-
-        rewritten = CodeRewriter(code).rewrite()
-        score = calculate_quality_score(analysis, feedback)
-
-        st.session_state.review_history.insert(
-            0, {"time": datetime.now().strftime("%H:%M:%S"), "score": score}
-        )
-        st.session_state.review_history = st.session_state.review_history[:5]
-
-        tabs = st.tabs(["🧾 Review", "⭐ Score", "✨ Rewrite", "🤖 LLM"])
-
-        with tabs[0]:
-            for f in feedback:
-                st.write(f)
-
-        with tabs[1]:
-            st.metric("Code Quality Score", f"{score}/100")
+    review_input = st.radio(
+        "Review Input",
+        ["📋 Paste Code", "📦 Batch Upload"],
+        horizontal=True
+    )
 
-        with tabs[2]:
-            c1, c2 = st.columns(2)
-            c1.code(code, language="python")
-            c2.code(rewritten, language="python")
+    if review_input == "📋 Paste Code":
+        with st.form("review_form"):
+            code = st.text_area("Paste Python Code", height=280)
+            submit = st.form_submit_button("🔍 Review Code", use_container_width=True)
+
+        if submit:
+            st.session_state.reviewed_code = code if code.strip() else None
+
+        # Reruns (tab switches, sidebar edits) show the last review
+        # again; results come from the review cache, so they render
+        # instantly and the LLM is not called a second time
+        reviewed = st.session_state.get("reviewed_code")
+        if reviewed:
+            service = CoderBuddyService(api_key, analysis_cache=st.session_state.analysis_cache)
+            review = service.review_code(reviewed)
+
+            llm_review = render_review(
+                reviewed,
+                review,
+                llm_stream=service.stream_llm_review(reviewed) if api_key else None
+            )
 
-        with tabs[3]:
-            if api_key:
-                llm = LLMCodeReviewer(api_key)
-                st.markdown(llm.review_code(code))
-            else:
-                st.info("Enter API key to enable LLM review")
+            if submit:
+                get_history_store().record(
+                    REVIEW,
+                    reviewed.strip().splitlines()[0][:80],
+                    {"code": reviewed, "review": review, "llm_review": llm_review},
+                    score=review["score"],
+                    owner=st.session_state.history_owner
+                )
+
+    else:
+        with st.form("batch_review_form"):
+            uploads = st.file_uploader(
+                "Upload a .zip archive or .py files",
+                type=["zip", "py"],
+                accept_multiple_files=True
+            )
+            submit_batch = st.form_submit_button("📦 Review Files", use_container_width=True)
+
+        if submit_batch and uploads:
+            from src.batch_review import BatchReviewer, BatchReport
+
+            report = BatchReport()
+            progress = st.empty()
+            results_box = st.container()
+
+            for result in BatchReviewer(executor=get_batch_executor()).review(
+                iter_uploaded_sources(uploads)
+            ):
+                report.add(result)
+                progress.caption(f"Reviewed {report.files} file(s)...")
+
+                if report.files > MAX_BATCH_EXPANDERS:
+                    continue
+                if "error" in result:
+                    results_box.error(f"❌ {result['path']}: {result['error']}")
+                    continue
+                with results_box.expander(f"{result['path']} → {result['score']}/100"):
+                    for f in result["feedback"]:
+                        st.write(f)
+                    if result["rewrite_diff"]:
+                        st.code(result["rewrite_diff"], language="diff")
+
+            summary = report.summary()
+            progress.empty()
+
+            st.subheader("📊 Batch Report")
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Files", summary["files"])
+            c2.metric("Average Score", f"{summary['average_score']}/100")
+            c3.metric("Syntax Errors", summary["syntax_errors"])
+            c4.metric("Warnings", summary["warnings"])
+
+            if summary["lowest_scores"]:
+                st.markdown("**Lowest scoring files**")
+                st.table(summary["lowest_scores"])
+            if summary["files"] > MAX_BATCH_EXPANDERS:
+                st.caption(
+                    f"Showing details for the first {MAX_BATCH_EXPANDERS} files only."
+                )
 
 # ==================================================
 # ✨ CODE GENERATION MODE
@@ -173,18 +400,33 @@ elif mode == "✨ Code Generation":
         elif not api_key:
             st.warning("Please enter API key.")
         else:
-            llm = LLMCodeReviewer(api_key)
-            code, explanation = llm.generate_code_with_explanation(request)
-
-            st.session_state.code_gen_history.insert(
-                0,
-                {"time": datetime.now().strftime("%H:%M:%S"), "prompt": request}
+            llm = get_llm_service(api_key).llm()
+
+            code_slot = st.empty()
+            explanation_header = st.empty()
+            explanation_slot = st.empty()
+            code, explanation = "", ""
+
+            for section, chunk in llm.stream_code_with_explanation(request):
+                if section == "code":
+                    code += chunk
+                    code_slot.code(code.replace("CODE:", "").strip(), language="python")
+                else:
+                    if not explanation:
+                        explanation_header.markdown("### 📘 Explanation")
+                    explanation += chunk
+                    explanation_slot.write(explanation.strip())
+
+            get_history_store().record(
+                GENERATION,
+                request,
+                {
+                    "request": request,
+                    "code": code.replace("CODE:", "").strip(),
+                    "explanation": explanation.strip()
+                },
+                owner=st.session_state.history_owner
             )
-            st.session_state.code_gen_history = st.session_state.code_gen_history[:5]
-
-            st.code(code, language="python")
-            st.markdown("### 📘 Explanation")
-            st.write(explanation)
 
 # ==================================================
 # 🧩 MINI PROJECT BUILDER MODE
@@ -210,42 +452,44 @@ else:
         elif not api_key:
             st.warning("Please enter API key.")
         else:
+            # Files show up here as they come out of the pipeline, then
+            # make way for the full result in plan order
+            progress = st.empty()
+            live = progress.container()
+
+            def show_file(built):
+                if built.content is None:
+                    live.warning(f"⚠️ Failed to generate {built.filename}: {built.error}")
+                else:
+                    with live:
+                        render_file(built.filename, built.content, built.problem)
+
             with st.spinner("Generating project..."):
-                blueprint = ProjectBlueprintGenerator(api_key).generate_blueprint(prompt)
-                plan = ProjectPlanner().create_plan(blueprint)
-                raw_files = ProjectCodeGenerator(api_key).generate_project_code(blueprint, plan)
-                files = ProjectFormatter().format_project(raw_files)
-                zip_data = ProjectZipper().create_zip(blueprint["project_name"], files)
-
-            st.session_state.project_build_history.insert(
-                0,
+                build = get_llm_service(api_key).build_project(prompt, on_file=show_file)
+            progress.empty()
+
+            blueprint = build["blueprint"]
+
+            get_history_store().record(
+                BUILD,
+                prompt,
                 {
-                    "time": datetime.now().strftime("%H:%M:%S"),
-                    "project": blueprint["project_name"],
-                    "mode": blueprint["interaction_mode"].upper()
-                }
+                    "blueprint": blueprint,
+                    "files": build["files"],
+                    "failures": build["failures"],
+                    "problems": build["problems"]
+                },
+                project_name=blueprint["project_name"],
+                meta={"interaction_mode": blueprint["interaction_mode"]},
+                owner=st.session_state.history_owner
             )
-            st.session_state.project_build_history = st.session_state.project_build_history[:5]
-
-            st.success("✅ Project generated successfully!")
-
-            st.subheader("▶️ How to Run This Project")
-            if blueprint["interaction_mode"] == "cli":
-                st.code("python main.py", language="bash")
-            else:
-                st.code("streamlit run app.py", language="bash")
-
-            st.subheader("📁 Generated Files")
-            for name, content in files.items():
-                with st.expander(name):
-                    if name.endswith(".md"):
-                        st.markdown(content)
-                    else:
-                        st.code(content, language="python")
-
-            st.download_button(
-                "⬇️ Download Project (ZIP)",
-                zip_data,
-                file_name=f"{blueprint['project_name']}.zip",
-                mime="application/zip"
+
+            render_build(
+                blueprint,
+                build["files"],
+                build["failures"],
+                build["timing"],
+                build["zip_data"].read(),
+                build["blueprint_cache"],
+                build["problems"]
             )
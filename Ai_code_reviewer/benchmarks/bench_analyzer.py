@@ -0,0 +1,72 @@
+"""
+Benchmark: single-pass visitor CodeAnalyzer vs the previous
+ast.walk + isinstance implementation.
+
+Run from the Ai_code_reviewer directory:
+
+    python -m benchmarks.bench_analyzer --lines 10000
+"""
+
+import argparse
+import ast
+import time
+
+from benchmarks.synthetic import make_source
+from src.analyzer import CodeAnalyzer
+
+
+# ---------------- PREVIOUS IMPLEMENTATION ----------------
+def legacy_analyze(code: str):
+    tree = ast.parse(code)
+    functions, variables, imports, loops = [], [], [], 0
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            functions.append({
+                "name": node.name,
+                "line": node.lineno,
+                "length": len(node.body),
+                "has_docstring": ast.get_docstring(node) is not None
+            })
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    variables.append(target.id)
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(alias.name)
+        if isinstance(node, ast.ImportFrom):
+            if node.module:
+                imports.append(node.module)
+        if isinstance(node, (ast.For, ast.While)):
+            loops += 1
+
+    return functions, variables, imports, loops
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    code = make_source(args.lines)
+    legacy = best_of(lambda: legacy_analyze(code), args.repeat)
+    visitor = best_of(lambda: CodeAnalyzer(code).run(), args.repeat)
+
+    print(f"lines:   {code.count(chr(10))}")
+    print(f"legacy:  {legacy * 1000:.1f} ms")
+    print(f"visitor: {visitor * 1000:.1f} ms ({visitor / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
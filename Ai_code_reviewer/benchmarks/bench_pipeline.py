@@ -0,0 +1,244 @@
+"""
+Offline micro-benchmarks for the local pipeline stages.
+
+Measures throughput and peak memory of CodeAnalyzer.run,
+CodeReviewRules.run_all, CodeRewriter.rewrite,
+ProjectFormatter.format_project and ProjectZipper.create_zip on
+synthetic inputs, plus time-to-first-file and peak memory of the
+staged build (format everything, then zip) against BuildPipeline
+with files arriving one by one. Writes machine-readable JSON so
+results can be compared between commits. No network access is needed.
+
+Run from the Ai_code_reviewer directory:
+
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.synthetic import SOURCES, make_llm_file_set
+from src.analyzer import CodeAnalyzer
+from src.project_builder.formatter import ProjectFormatter
+from src.project_builder.pipeline import BuildPipeline
+from src.project_builder.validator import ProjectValidator
+from src.project_builder.zipper import ProjectZipper
+from src.rewriter import CodeRewriter
+from src.rules import CodeReviewRules
+
+SIZES = [100, 1000, 10000, 50000]
+QUICK_SIZES = [100, 1000]
+FILE_SETS = [(4, 100), (8, 1000)]
+BUILD_SETS = [(8, 1000), (32, 1000)]
+# Simulated gap between two generated files arriving
+ARRIVAL_SECONDS = 0.002
+
+
+# ---------------- MEASUREMENT ----------------
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Best wall time over ``repeat`` runs, then one traced run for
+    peak memory (tracemalloc slows code down, so it is kept apart).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def bench_sources(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for kind, make in SOURCES.items():
+        for size in sizes:
+            code = make(size)
+            lines = code.count("\n")
+            analysis = CodeAnalyzer(code).run()
+
+            stages = {
+                "analyzer": lambda: CodeAnalyzer(code).run(),
+                "rules": lambda: CodeReviewRules(analysis).run_all(),
+                "rewriter": lambda: CodeRewriter(code).rewrite()
+            }
+            for stage, fn in stages.items():
+                stats = measure(fn, repeat)
+                results.append({
+                    "stage": stage,
+                    "input": f"{kind}-{size}",
+                    "lines": lines,
+                    "seconds": round(stats["seconds"], 6),
+                    "lines_per_second": round(lines / stats["seconds"]) if stats["seconds"] else None,
+                    "peak_bytes": stats["peak_bytes"]
+                })
+    return results
+
+
+def bench_file_sets(file_sets, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for files, lines_per_file in file_sets:
+        raw = make_llm_file_set(files, lines_per_file)
+        formatted = ProjectFormatter().format_project(raw)
+        size = sum(len(v.encode("utf-8")) for v in raw.values())
+
+        stages = {
+            "formatter": lambda: ProjectFormatter().format_project(raw),
+            "zipper": lambda: ProjectZipper().create_zip("bench_project", formatted)
+        }
+        for stage, fn in stages.items():
+            stats = measure(fn, repeat)
+            results.append({
+                "stage": stage,
+                "input": f"files-{files}x{lines_per_file}",
+                "bytes": size,
+                "seconds": round(stats["seconds"], 6),
+                "bytes_per_second": round(size / stats["seconds"]) if stats["seconds"] else None,
+                "peak_bytes": stats["peak_bytes"]
+            })
+    return results
+
+
+def staged_build(raw: Dict[str, str]) -> float:
+    """
+    The old flow: wait for every file, format and validate all,
+    then zip all. Returns the time until the first file was ready
+    to show.
+    """
+    start = time.perf_counter()
+    arrived = {}
+    for filename, content in raw.items():
+        time.sleep(ARRIVAL_SECONDS)
+        arrived[filename] = content
+    formatted = ProjectFormatter().format_project(arrived)
+    validator = ProjectValidator(formatted)
+    for filename, content in formatted.items():
+        validator.check_file(filename, content)
+    first = time.perf_counter() - start
+    ProjectZipper().create_zip("bench_project", formatted).close()
+    return first
+
+
+def pipelined_build(raw: Dict[str, str]) -> float:
+    """
+    BuildPipeline fed by a producer thread as files arrive.
+    """
+    start = time.perf_counter()
+    pipeline = BuildPipeline("bench_project", raw, ProjectZipper().open(), ProjectFormatter())
+    first = []
+
+    def produce():
+        for filename, content in raw.items():
+            time.sleep(ARRIVAL_SECONDS)
+            pipeline.put(filename, content)
+        pipeline.close()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    pipeline.run(lambda built: first or first.append(time.perf_counter() - start))
+    producer.join()
+    pipeline.writer.close().close()
+    return first[0]
+
+
+def bench_builds(build_sets, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for files, lines_per_file in build_sets:
+        raw = make_llm_file_set(files, lines_per_file)
+        size = sum(len(v.encode("utf-8")) for v in raw.values())
+
+        for stage, build in (("staged", staged_build), ("pipelined", pipelined_build)):
+            first_file = min(build(raw) for _ in range(repeat))
+            stats = measure(lambda: build(raw), repeat)
+            results.append({
+                "stage": stage,
+                "input": f"build-{files}x{lines_per_file}",
+                "bytes": size,
+                "seconds": round(stats["seconds"], 6),
+                "first_file_seconds": round(first_file, 6),
+                "peak_bytes": stats["peak_bytes"]
+            })
+    return results
+
+
+# ---------------- REPORTING ----------------
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["stage"], r["input"]): r for r in json.load(f)["results"]}
+
+    print(f"{'stage':<10} {'input':<22} {'time':>8} {'memory':>8}")
+    for result in current:
+        base = baseline.get((result["stage"], result["input"]))
+        if not base:
+            continue
+        time_ratio = result["seconds"] / base["seconds"] if base["seconds"] else 0
+        mem_ratio = result["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] else 0
+        print(f"{result['stage']:<10} {result['input']:<22} {time_ratio:>7.2f}x {mem_ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="small inputs only")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    file_sets = FILE_SETS[:1] if args.quick else FILE_SETS
+    build_sets = BUILD_SETS[:1] if args.quick else BUILD_SETS
+    results = (
+        bench_sources(sizes, args.repeat)
+        + bench_file_sets(file_sets, args.repeat)
+        + bench_builds(build_sets, args.repeat)
+    )
+
+    for result in results:
+        print(
+            f"{result['stage']:<10} {result['input']:<22} "
+            f"{result['seconds'] * 1000:>10.2f} ms {result['peak_bytes'] / 1024:>10.0f} KiB"
+            + (
+                f" (first file {result['first_file_seconds'] * 1000:.2f} ms)"
+                if "first_file_seconds" in result else ""
+            )
+        )
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "results": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
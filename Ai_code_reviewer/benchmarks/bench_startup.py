@@ -0,0 +1,137 @@
+"""
+Cold-start benchmark for app.py.
+
+Every measurement runs in a fresh interpreter so imports are cold:
+
+- import time of the modules app.py used to import eagerly vs the
+  modules it imports now (streamlit itself excluded)
+- import time of the LLM client stack paid on first LLM use
+- time to first render and to a rerun of the app via Streamlit's
+  AppTest (skipped when streamlit is not installed)
+
+Run from the Ai_code_reviewer directory:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --app app.py --app app_before.py --output startup.json
+"""
+
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+# What app.py imported at the top before lazy loading
+EAGER_IMPORTS = [
+    "src.analyzer",
+    "src.incremental",
+    "src.rules",
+    "src.rewriter",
+    "src.llm_reviewer",
+    "src.utils",
+    "src.metrics",
+    "src.batch_review",
+    "src.service",
+    "src.project_builder.blueprint",
+    "src.project_builder.planner",
+    "src.project_builder.generator",
+    "src.project_builder.formatter",
+    "src.project_builder.zipper"
+]
+
+# What app.py imports at the top now
+LAZY_IMPORTS = ["src.incremental", "src.service"]
+
+# Paid on the first LLM call (see src.llm_client)
+LLM_CLIENT_IMPORTS = ["httpx", "groq"]
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(time.perf_counter() - start)
+"""
+
+RENDER_SCRIPT = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - start
+print(first, rerun, len(app.exception))
+"""
+
+
+def run_fresh(script: str, args: List[str]) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", script, *args],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def import_seconds(modules: List[str], repeat: int) -> float:
+    return min(float(run_fresh(IMPORT_SCRIPT, modules)) for _ in range(repeat))
+
+
+def render_seconds(app: str, repeat: int) -> Optional[Dict[str, float]]:
+    best: Optional[Dict[str, float]] = None
+    for _ in range(repeat):
+        first, rerun, errors = run_fresh(RENDER_SCRIPT, [app]).split()
+        if int(errors):
+            raise RuntimeError(f"{app} raised during the first render")
+        if best is None or float(first) < best["first_render"]:
+            best = {"first_render": float(first), "rerun": float(rerun)}
+    return best
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app", action="append", help="app file(s) to render (default app.py)")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {"python": sys.version.split()[0], "imports": {}, "render": {}}
+
+    eager = import_seconds(EAGER_IMPORTS, args.repeat)
+    lazy = import_seconds(LAZY_IMPORTS, args.repeat)
+    results["imports"] = {"eager": round(eager, 4), "lazy": round(lazy, 4)}
+    print(f"imports (eager, before): {eager * 1000:8.1f} ms")
+    print(f"imports (lazy, now):     {lazy * 1000:8.1f} ms ({lazy / eager:.2f}x)")
+
+    if all(installed(m) for m in LLM_CLIENT_IMPORTS):
+        first_llm = import_seconds(LLM_CLIENT_IMPORTS, args.repeat)
+        results["imports"]["llm_client"] = round(first_llm, 4)
+        print(f"LLM client (first use):  {first_llm * 1000:8.1f} ms")
+
+    if installed("streamlit"):
+        for app in args.app or ["app.py"]:
+            timing = render_seconds(app, args.repeat)
+            results["render"][app] = {k: round(v, 4) for k, v in timing.items()}
+            print(
+                f"{app}: first render {timing['first_render'] * 1000:.1f} ms, "
+                f"rerun {timing['rerun'] * 1000:.1f} ms"
+            )
+    else:
+        print("streamlit not installed: skipping render timings")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
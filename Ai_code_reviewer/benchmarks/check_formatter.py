@@ -0,0 +1,121 @@
+"""
+Equivalence check: StreamingFormatter against ProjectFormatter.
+
+Every raw LLM output in the corpus (benchmarks/formatter_corpus.jsonl,
+optionally plus every response in the local LLM cache) is fed to the
+streaming formatter whole, in fixed-size chunks and in random chunks,
+and must come out byte for byte identical to
+ProjectFormatter.format_file. Random inputs built from the
+troublesome pieces (fences, backtick runs, prose prefixes, CR/LF and
+the other str.splitlines boundaries) can be added with --fuzz.
+Exits with status 1 if any chunking differs. No network access is needed.
+
+Run from the Ai_code_reviewer directory:
+
+    python -m benchmarks.check_formatter
+    python -m benchmarks.check_formatter --llm-cache --fuzz 20000
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from src.project_builder.formatter import ProjectFormatter
+from src.utils import get_data_dir
+
+CORPUS = Path(__file__).with_name("formatter_corpus.jsonl")
+CHUNK_SIZES = [1, 2, 3, 7, 16, 64]
+FUZZ_PIECES = [
+    "`", "``", "```", "```python", "\n", "\r", "\r\n", "\n\n\n", " ", "\t",
+    "x = 1", "def f():", "    return 1", "# note", "Here is", "here is the code:",
+    "This code", "The following", "Below is", "\x0b", "\x0c", "\x1c", "\x85",
+    "\u2028", "\u2029", "\u0130"
+]
+
+
+def iter_corpus() -> Iterator[Tuple[str, str, str]]:
+    with open(CORPUS, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                sample = json.loads(line)
+                yield sample["name"], sample["filename"], sample["text"]
+
+
+def iter_llm_cache(path: Path) -> Iterator[Tuple[str, str, str]]:
+    """
+    Recorded responses, checked both as Python and as markdown.
+    """
+    if not path.exists():
+        return
+    conn = sqlite3.connect(path)
+    try:
+        for key, value in conn.execute("SELECT key, value FROM entries"):
+            for filename in ("cached.py", "cached.md"):
+                yield f"cache:{key[:12]}", filename, value
+    finally:
+        conn.close()
+
+
+def iter_fuzz(count: int, rng: random.Random) -> Iterator[Tuple[str, str, str]]:
+    for number in range(count):
+        text = "".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 40)))
+        yield f"fuzz:{number}", "fuzz.py" if number % 2 else "fuzz.md", text
+
+
+def splits(text: str, rng: random.Random) -> Iterator[List[str]]:
+    yield [text]
+    for size in CHUNK_SIZES:
+        yield [text[i:i + size] for i in range(0, len(text), size)]
+    chunks, index = [], 0
+    while index < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[index:index + size])
+        index += size
+    yield chunks
+
+
+def check(samples, rng: random.Random, limit: int = 5) -> Tuple[int, int]:
+    formatter = ProjectFormatter()
+    checked = failed = 0
+
+    for name, filename, text in samples:
+        expected = formatter.format_file(filename, text)
+        for chunks in splits(text, rng):
+            stream = formatter.stream(filename)
+            actual = "".join(stream.feed(chunk) for chunk in chunks) + stream.finish()
+            checked += 1
+            if actual != expected:
+                failed += 1
+                if failed <= limit:
+                    print(f"MISMATCH {name} ({filename}, {len(chunks)} chunks)")
+                    print(f"  input:    {text!r}")
+                    print(f"  expected: {expected!r}")
+                    print(f"  actual:   {actual!r}")
+                break
+    return checked, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--llm-cache", action="store_true", help="also check the local LLM response cache")
+    parser.add_argument("--fuzz", type=int, default=0, help="number of random inputs to add")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = list(iter_corpus())
+    if args.llm_cache:
+        samples.extend(iter_llm_cache(get_data_dir() / "llm_cache.sqlite3"))
+    samples.extend(iter_fuzz(args.fuzz, rng))
+
+    checked, failed = check(samples, rng)
+    print(f"{len(samples)} inputs, {checked} chunkings, {failed} mismatches")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Behaviour check: CodeRewriter renames must not change what code does.
+
+Every case below is run as written and after CodeRewriter.rewrite;
+printed output and the raised exception type (if any) must be
+identical. Cases cover the scoping corners the rename resolver has to
+get right (comprehension scopes, walrus targets that escape them,
+closures, class attributes, keyword callers and global/nonlocal
+declarations) and characters str.splitlines treats as line breaks
+but Python does not.
+Exits with status 1 if any case behaves differently. No network access is needed.
+
+Run from the Ai_code_reviewer directory:
+
+    python -m benchmarks.check_rewriter
+"""
+
+import contextlib
+import io
+import sys
+from typing import Optional, Tuple
+
+from src.rewriter import CodeRewriter
+
+CASES = {
+    "walrus in generator, read after": (
+        "data = [1, 2]\n"
+        "if any((y := v) > 1 for v in data):\n"
+        "    print(y)\n"
+    ),
+    "walrus in list comp, returned": (
+        "def last(data):\n"
+        "    [n := d for d in data]\n"
+        "    return n\n"
+        "print(last([3, 4]))\n"
+    ),
+    "walrus in nested comprehension": (
+        "def f(rows):\n"
+        "    found = [[(x := c) for c in row] for row in rows]\n"
+        "    return x, found\n"
+        "print(f([[1], [2, 3]]))\n"
+    ),
+    "walrus outside comprehension": (
+        "def f(items):\n"
+        "    if (n := len(items)) > 1:\n"
+        "        return n\n"
+        "    return -n\n"
+        "print(f([1, 2]), f([]))\n"
+    ),
+    "comprehension variable shadows outer": (
+        "x = 10\n"
+        "values = [x * 2 for x in range(3)]\n"
+        "print(x, values)\n"
+    ),
+    "closure reads outer name": (
+        "def outer():\n"
+        "    n = 3\n"
+        "    def inner():\n"
+        "        return n + 1\n"
+        "    return inner()\n"
+        "print(outer())\n"
+    ),
+    "class attribute": (
+        "class Point:\n"
+        "    x = 1\n"
+        "    def get(self):\n"
+        "        return self.x\n"
+        "print(Point().get())\n"
+    ),
+    "parameter passed by keyword": (
+        "def area(x, y):\n"
+        "    return x * y\n"
+        "print(area(x=2, y=3))\n"
+    ),
+    "nonlocal counter": (
+        "def counter():\n"
+        "    i = 0\n"
+        "    def bump():\n"
+        "        nonlocal i\n"
+        "        i += 1\n"
+        "        return i\n"
+        "    bump()\n"
+        "    return bump()\n"
+        "print(counter())\n"
+    ),
+    "global total": (
+        "s = 0\n"
+        "def add(v):\n"
+        "    global s\n"
+        "    s += v\n"
+        "add(2)\n"
+        "print(s)\n"
+    ),
+    "U+2028 inside a string": (
+        's = "a\u2028b"\n'
+        "x = 1\n"
+        "print(x, len(s))\n"
+    ),
+    "form feed in a comment": (
+        "# section\x0cbreak\n"
+        "x = 1\n"
+        "print(x)\n"
+    ),
+    "docstring after a U+2029 line": (
+        'label = "p\u2029q"\n'
+        "def area(w, h):\n"
+        "    return w * h\n"
+        "print(area(2, 3), label)\n"
+    ),
+}
+
+
+def run(code: str) -> Tuple[str, Optional[str]]:
+    out = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(out):
+        try:
+            exec(compile(code, "<case>", "exec"), {"__name__": "__case__"})
+        except Exception as e:
+            error = type(e).__name__
+    return out.getvalue(), error
+
+
+def main():
+    failed = 0
+    for name, code in CASES.items():
+        rewritten = CodeRewriter(code).rewrite()
+        expected, actual = run(code), run(rewritten)
+        if expected != actual:
+            failed += 1
+            print(f"MISMATCH {name}")
+            print(f"  rewritten: {rewritten!r}")
+            print(f"  expected:  {expected!r}")
+            print(f"  actual:    {actual!r}")
+
+    print(f"{len(CASES)} cases, {failed} mismatches")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
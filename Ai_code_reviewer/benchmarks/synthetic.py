@@ -0,0 +1,98 @@
+"""
+Deterministic synthetic inputs for the offline benchmarks.
+"""
+
+import random
+from typing import Dict
+
+FUNCTION_TEMPLATE = '''
+def process_{n}(items, limit=10):
+    """Process a batch of items."""
+    total = 0
+    for index, item in enumerate(items):
+        if item > limit and index % 2 == 0:
+            total += item
+        elif item < 0 or item is None:
+            continue
+        else:
+            while total > limit:
+                total -= 1
+    values = [x * 2 for x in items if x]
+    return total if values else -1
+'''
+
+SMALL_FUNCTION_TEMPLATE = '''
+def helper_{n}(x, y):
+    s = x + y
+    return s
+'''
+
+
+def make_source(lines: int) -> str:
+    """
+    Realistic mix of branches, loops and comprehensions.
+    """
+    header = "import os\nfrom typing import List\n"
+    block_lines = FUNCTION_TEMPLATE.count("\n")
+    blocks = max(1, lines // block_lines)
+    return header + "".join(FUNCTION_TEMPLATE.format(n=n) for n in range(blocks))
+
+
+def make_many_functions(lines: int) -> str:
+    """
+    Many tiny functions with short variable names.
+    """
+    block_lines = SMALL_FUNCTION_TEMPLATE.count("\n")
+    blocks = max(1, lines // block_lines)
+    return "".join(SMALL_FUNCTION_TEMPLATE.format(n=n) for n in range(blocks))
+
+
+def make_deep_nesting(lines: int, depth: int = 16) -> str:
+    """
+    Functions whose bodies nest ``depth`` blocks deep.
+    """
+    parts = []
+    n = 0
+    written = 0
+    while written < lines:
+        body = [f"def nested_{n}(data):"]
+        for level in range(1, depth + 1):
+            indent = "    " * level
+            keyword = ("if data", "for item in data", "while data")[level % 3]
+            body.append(f"{indent}{keyword}:")
+        body.append("    " * (depth + 1) + "data = data[1:]")
+        body.append("    return data\n")
+        parts.append("\n".join(body) + "\n")
+        written += len(body) + 1
+        n += 1
+    return "".join(parts)
+
+
+SOURCES = {
+    "mixed": make_source,
+    "many_functions": make_many_functions,
+    "deep_nesting": make_deep_nesting
+}
+
+
+def make_llm_file_set(files: int, lines_per_file: int, seed: int = 0) -> Dict[str, str]:
+    """
+    LLM-style raw outputs: code fences, leading prose, blank runs.
+    """
+    rng = random.Random(seed)
+    result = {"README.md": "```markdown\n# Project\n\nGenerated.\n```\n"}
+
+    for index in range(files):
+        code = make_source(lines_per_file)
+        lines = code.splitlines()
+        # Sprinkle runs of blank lines like real completions
+        for _ in range(max(1, len(lines) // 50)):
+            lines.insert(rng.randrange(len(lines)), "\n\n\n")
+        body = "\n".join(lines)
+        result[f"module_{index}.py"] = (
+            "Here is the implementation you asked for:\n"
+            f"```python\n{body}\n```\n"
+            "This code handles the requested features.\n"
+        )
+
+    return result
@@ -0,0 +1,231 @@
+"""
+Coder Buddy command line interface (no Streamlit required).
+
+    python cli.py review src/ project.zip --llm
+    python cli.py generate "a function that parses CSV rows"
+    python cli.py build "a CLI todo app that saves tasks" --output-dir builds/
+    python cli.py batch jobs.jsonl --workers 8 --output results.jsonl
+    python cli.py batch builds.jsonl --task build --bundle projects.zip
+
+Batch input is one JSON object per line, e.g.
+
+    {"id": 1, "task": "review", "path": "src/app.py"}
+    {"id": 2, "task": "generate", "prompt": "fizzbuzz"}
+    {"id": 3, "task": "build", "prompt": "a todo app"}
+
+and results are written as JSONL in completion order. The API key is
+read from --api-key or the GROQ_API_KEY environment variable.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator
+
+from src.batch_review import iter_directory_sources, iter_zip_sources
+from src.project_builder.zipper import ProjectZipper
+from src.service import TASKS, CoderBuddyService
+
+
+# ==================================================
+# INPUT HELPERS
+# ==================================================
+def iter_path_jobs(paths) -> Iterator[Dict[str, Any]]:
+    """
+    Review jobs for .py files, directories and .zip archives.
+    """
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            sources = (
+                (f"{path.as_posix()}/{name}", code)
+                for name, code in iter_directory_sources(path)
+            )
+        elif path.suffix == ".zip":
+            sources = iter_zip_sources(path)
+        else:
+            sources = [(raw, path.read_text(encoding="utf-8", errors="replace"))]
+        for name, code in sources:
+            yield {"id": name, "task": "review", "path": name, "code": code}
+
+
+def iter_jsonl_jobs(stream: IO[str], default_task: str = None) -> Iterator[Dict[str, Any]]:
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"id": f"line-{number}", "task": None, "invalid": str(e)}
+            continue
+        if isinstance(job, str):
+            job = {"prompt": job}
+        elif not isinstance(job, dict):
+            yield {"id": f"line-{number}", "task": None, "invalid": "job must be a JSON object or string"}
+            continue
+        job.setdefault("id", number)
+        if default_task:
+            job.setdefault("task", default_task)
+        yield job
+
+
+def write_jsonl(record: Dict[str, Any], out: IO[str]):
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+# ==================================================
+# COMMANDS
+# ==================================================
+def cmd_review(service: CoderBuddyService, args) -> int:
+    exit_code = 0
+    jobs = iter_path_jobs(args.paths)
+    if args.llm:
+        jobs = ({**job, "llm": True} for job in jobs)
+
+    for result in service.run_batch(jobs, max_workers=args.workers):
+        if "error" in result:
+            exit_code = 1
+        elif not args.rewrite:
+            result.pop("rewritten", None)
+        write_jsonl(result, sys.stdout)
+    return exit_code
+
+
+def cmd_generate(service: CoderBuddyService, args) -> int:
+    result = service.generate_code(args.prompt)
+    if args.json:
+        write_jsonl(result, sys.stdout)
+    else:
+        print(result["code"])
+        print("\n# Explanation\n")
+        print(result["explanation"])
+    return 0
+
+
+def cmd_build(service: CoderBuddyService, args) -> int:
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    build = service.build_project(
+        args.prompt,
+        on_stage=lambda name: print(f"[{name}]", file=sys.stderr, flush=True),
+        smoke_test=args.smoke_test,
+        max_retries=args.max_retries
+    )
+    name = build["blueprint"]["project_name"]
+    zip_path = output_dir / f"{name}.zip"
+    with open(zip_path, "wb") as f:
+        shutil.copyfileobj(build["zip_data"], f)
+    build["zip_data"].close()
+
+    for filename, error in build["failures"].items():
+        print(f"⚠️ Failed to generate {filename}: {error}", file=sys.stderr)
+    for filename, problem in build["problems"].items():
+        print(f"⚠️ {filename} failed validation ({problem})", file=sys.stderr)
+    for filename, attempts in build["regenerated"].items():
+        print(f"🔁 {filename} regenerated {attempts}x", file=sys.stderr)
+    print(f"✅ {zip_path} ({len(build['files'])} files, {build['timing']['total_seconds']:.1f}s)")
+    if build["blueprint_cache"]["hit"]:
+        print(f"blueprint cache hit, saved {build['blueprint_cache']['saved_seconds']:.1f}s")
+    return 1 if build["failures"] else 0
+
+
+def cmd_batch(service: CoderBuddyService, args) -> int:
+    source = sys.stdin if args.jobs == "-" else open(args.jobs, encoding="utf-8")
+    out = sys.stdout if args.output in (None, "-") else open(args.output, "w", encoding="utf-8")
+    failed = 0
+
+    def valid_jobs():
+        nonlocal failed
+        for job in iter_jsonl_jobs(source, args.task):
+            if "invalid" in job:
+                failed += 1
+                write_jsonl({"id": job["id"], "task": None, "error": job["invalid"]}, out)
+                continue
+            yield job
+
+    bundle = ProjectZipper().open(args.bundle) if args.bundle else None
+
+    try:
+        for result in service.run_batch(
+            valid_jobs(),
+            max_workers=args.workers,
+            zip_dir=args.zip_dir,
+            bundle=bundle
+        ):
+            failed += "error" in result
+            write_jsonl(result, out)
+    finally:
+        if bundle is not None:
+            bundle.close().close()
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if failed:
+        print(f"{failed} job(s) failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Coder Buddy command line interface")
+    parser.add_argument("--api-key", default=os.environ.get("GROQ_API_KEY"))
+    parser.add_argument("--base-url", default=os.environ.get("GROQ_BASE_URL"))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    review = sub.add_parser("review", help="review .py files, directories or .zip archives")
+    review.add_argument("paths", nargs="+")
+    review.add_argument("--llm", action="store_true", help="add an LLM review per file")
+    review.add_argument("--rewrite", action="store_true", help="include rewritten code")
+    review.add_argument("--workers", type=int, default=4)
+    review.set_defaults(handler=cmd_review)
+
+    generate = sub.add_parser("generate", help="generate Python code with an explanation")
+    generate.add_argument("prompt")
+    generate.add_argument("--json", action="store_true")
+    generate.set_defaults(handler=cmd_generate)
+
+    build = sub.add_parser("build", help="build a mini project ZIP")
+    build.add_argument("prompt")
+    build.add_argument("--output-dir", default=".")
+    build.add_argument(
+        "--smoke-test", action="store_true",
+        help="import every generated module in a subprocess; this runs the generated code "
+             "on this machine and is NOT sandboxed"
+    )
+    build.add_argument("--max-retries", type=int, default=1, help="regenerations per broken file")
+    build.set_defaults(handler=cmd_build)
+
+    batch = sub.add_parser("batch", help="run JSONL jobs with bounded concurrency")
+    batch.add_argument("jobs", help="JSONL file, or - for stdin")
+    batch.add_argument("--output", help="JSONL results file (default stdout)")
+    batch.add_argument("--workers", type=int, default=4)
+    batch.add_argument("--task", choices=TASKS, help="task for jobs that do not set one")
+    batch.add_argument("--zip-dir", help="where build jobs write their ZIPs")
+    batch.add_argument("--bundle", help="also bundle every built project into this ZIP")
+    batch.set_defaults(handler=cmd_batch)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    service = CoderBuddyService(args.api_key, args.base_url)
+    try:
+        return args.handler(service, args)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
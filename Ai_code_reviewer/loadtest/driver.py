@@ -0,0 +1,299 @@
+"""
+Load driver: runs N concurrent sessions through the same review,
+generation and mini-project build code paths as app.py (through
+src.service) against the local fake Groq server, and reports
+throughput, latency percentiles and error rates.
+
+Run from the Ai_code_reviewer directory:
+
+    python -m loadtest.driver --sessions 20 --iterations 5
+    python -m loadtest.driver --sessions 50 --error-429 0.1 --output load.json
+
+Pass ``--base-url`` to target an already running server instead of
+starting one in-process.
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import make_source
+from loadtest.fake_groq import FakeGroqServer, add_server_arguments, config_from_args
+from src.llm_scheduler import LLMScheduler, status_code
+from src.metrics import PipelineMetrics
+from src.service import CoderBuddyService
+
+API_KEY = "loadtest-key"
+SCENARIOS = ("review", "generate", "build")
+
+
+# ==================================================
+# APP FLOWS
+# ==================================================
+class Session:
+    """
+    One simulated user: own analysis cache, shared client pool and
+    scheduler (as every Streamlit session sharing an API key).
+    """
+
+    def __init__(self, base_url: str, scheduler: LLMScheduler, code: str):
+        self.code = code
+        # The response cache would turn repeated prompts into hits, and
+        # load-test builds must not skew the app's timing history
+        self.service = CoderBuddyService(
+            API_KEY,
+            base_url=base_url,
+            enable_cache=False,
+            scheduler=scheduler,
+            metrics_path=os.devnull
+        )
+
+    def review(self, metrics: PipelineMetrics):
+        self.service.review_code(self.code)
+        return "".join(self.service.llm(metrics).stream_review_code(self.code))
+
+    def generate(self, metrics: PipelineMetrics):
+        sections = {"code": "", "explanation": ""}
+        for section, chunk in self.service.llm(metrics).stream_code_with_explanation(
+            "Write a function that loads tasks from a JSON file"
+        ):
+            sections[section] += chunk
+        return sections
+
+    def build(self, metrics: PipelineMetrics):
+        build = self.service.build_project(
+            "Build a command line todo app that saves tasks to a file",
+            metrics=metrics
+        )
+        if build["failures"]:
+            # Surface partial builds as errors, like the app's warnings
+            name, error = next(iter(build["failures"].items()))
+            raise RuntimeError(f"{name}: {error}")
+        return build["files"]
+
+
+# ==================================================
+# RESULTS
+# ==================================================
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LoadResults:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {s: [] for s in SCENARIOS}
+        self.errors: Dict[str, Dict[str, int]] = {s: {} for s in SCENARIOS}
+        self.llm_calls = 0
+        self.llm_retries = 0
+        self._lock = threading.Lock()
+
+    def record(self, scenario: str, seconds: float, metrics: PipelineMetrics, error: Optional[Exception]):
+        summary = metrics.summary()
+        with self._lock:
+            self.llm_calls += summary["llm_calls"]
+            self.llm_retries += summary["retries"]
+            if error is None:
+                self.samples[scenario].append(seconds)
+            else:
+                code = status_code(error)
+                label = str(code) if code is not None else type(error).__name__
+                errors = self.errors[scenario]
+                errors[label] = errors.get(label, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        scenarios = {}
+        for scenario in SCENARIOS:
+            samples = self.samples[scenario]
+            failed = sum(self.errors[scenario].values())
+            total = len(samples) + failed
+            if not total:
+                continue
+            scenarios[scenario] = {
+                "runs": total,
+                "ok": len(samples),
+                "error_rate": round(failed / total, 4),
+                "errors": self.errors[scenario],
+                "p50": round(percentile(samples, 0.5), 3),
+                "p95": round(percentile(samples, 0.95), 3),
+                "p99": round(percentile(samples, 0.99), 3),
+                "max": round(max(samples), 3) if samples else 0.0
+            }
+
+        completed = sum(len(s) for s in self.samples.values())
+        failed = sum(sum(e.values()) for e in self.errors.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "flows": completed + failed,
+            "throughput_per_second": round(completed / elapsed, 3) if elapsed else 0.0,
+            "error_rate": round(failed / (completed + failed), 4) if completed + failed else 0.0,
+            "llm_calls": self.llm_calls,
+            "llm_retries": self.llm_retries,
+            "scenarios": scenarios
+        }
+
+
+# ==================================================
+# DRIVER
+# ==================================================
+def run_load(
+    base_url: str,
+    sessions: int,
+    iterations: int,
+    mix: Dict[str, float],
+    scheduler: LLMScheduler,
+    code_lines: int = 200,
+    seed: int = 0,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run ``sessions`` concurrent sessions of ``iterations`` flows each,
+    picking flows by the weights in ``mix``.
+    """
+    results = LoadResults()
+    code = make_source(code_lines)
+    scenarios = [s for s in SCENARIOS if mix.get(s)]
+    weights = [mix[s] for s in scenarios]
+    total = sessions * iterations
+    done = [0]
+    done_lock = threading.Lock()
+
+    def run_session(index: int):
+        rng = random.Random(seed + index)
+        session = Session(base_url, scheduler, code)
+        for _ in range(iterations):
+            scenario = rng.choices(scenarios, weights)[0]
+            metrics = PipelineMetrics(f"loadtest_{scenario}")
+            start = time.perf_counter()
+            error = None
+            try:
+                getattr(session, scenario)(metrics)
+            except Exception as e:
+                error = e
+            results.record(scenario, time.perf_counter() - start, metrics, error)
+            if progress:
+                with done_lock:
+                    done[0] += 1
+                    progress(done[0], total)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        for future in [pool.submit(run_session, i) for i in range(sessions)]:
+            future.result()
+    report = results.report(time.perf_counter() - start)
+    report["scheduler"] = scheduler.stats()
+    return report
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    "review=2,generate=1,build=1" -> weights per scenario.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def print_report(report: Dict[str, Any]):
+    print(
+        f"{report['flows']} flows in {report['elapsed_seconds']}s → "
+        f"{report['throughput_per_second']} flows/s, "
+        f"error rate {report['error_rate']:.2%}"
+    )
+    print(f"LLM calls: {report['llm_calls']} (retries {report['llm_retries']})")
+    print(f"{'scenario':<10} {'runs':>6} {'err%':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, row in report["scenarios"].items():
+        print(
+            f"{name:<10} {row['runs']:>6} {row['error_rate']:>7.2%} "
+            f"{row['p50']:>8.3f} {row['p95']:>8.3f} {row['p99']:>8.3f} {row['max']:>8.3f}"
+        )
+        if row["errors"]:
+            print(f"{'':<10} errors: {row['errors']}")
+    if "server" in report:
+        print(f"server: {report['server']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("review=1,generate=1,build=1"))
+    parser.add_argument("--code-lines", type=int, default=200)
+    parser.add_argument("--base-url", default=None, help="use a running server")
+    parser.add_argument("--rpm", type=float, default=6000, help="scheduler requests per minute")
+    parser.add_argument("--tpm", type=float, default=10_000_000, help="scheduler tokens per minute")
+    parser.add_argument("--concurrency", type=float, default=8, help="initial scheduler concurrency")
+    parser.add_argument("--max-concurrency", type=float, default=64)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--output", help="write the report as JSON")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    scheduler = LLMScheduler(
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        initial_concurrency=args.concurrency,
+        max_concurrency=args.max_concurrency,
+        max_retries=args.max_retries
+    )
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = FakeGroqServer(config=config_from_args(args)).start()
+        base_url = server.base_url
+
+    def progress(done: int, total: int):
+        if done % max(1, total // 10) == 0 or done == total:
+            print(f"  {done}/{total} flows", flush=True)
+
+    try:
+        report = run_load(
+            base_url,
+            args.sessions,
+            args.iterations,
+            args.mix,
+            scheduler,
+            code_lines=args.code_lines,
+            seed=args.seed or 0,
+            progress=progress
+        )
+    finally:
+        if server is not None:
+            report_server = server.stats()
+            server.stop()
+
+    if server is not None:
+        report["server"] = report_server
+    report["settings"] = {
+        "sessions": args.sessions,
+        "iterations": args.iterations,
+        "mix": args.mix,
+        "latency": args.latency,
+        "latency_mean": args.latency_mean,
+        "error_429": args.error_429,
+        "error_500": args.error_500
+    }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Local stand-in for the Groq chat-completions endpoint.
+
+Speaks the OpenAI-compatible protocol the ``groq`` SDK uses
+(POST /openai/v1/chat/completions, JSON or SSE streaming), with
+configurable latency, canned responses per prompt kind and injected
+429 / 500 errors. Point LLMCodeReviewer at it with
+``base_url=server.base_url``.
+
+Run standalone from the Ai_code_reviewer directory:
+
+    python -m loadtest.fake_groq --port 8765 --error-429 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+BLUEPRINT_JSON = {
+    "project_name": "todo_manager",
+    "project_type": "script",
+    "interaction_mode": "cli",
+    "features": ["add tasks", "list tasks", "save tasks to a file"],
+    "entry_point": "main.py",
+    "description": "Manage a todo list and save it to a file."
+}
+
+PYTHON_FILE = '''import json
+
+
+def load_tasks(path):
+    """Load tasks from a JSON file."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def add_task(tasks, title):
+    """Append a task and return the list."""
+    tasks.append({"title": title, "done": False})
+    return tasks
+'''
+
+REVIEW_MARKDOWN = """### Issues
+- Variable names are too short to be descriptive.
+- Functions are missing docstrings.
+
+### Suggestions
+- Rename single-letter variables.
+- Add a docstring to every public function.
+
+### Rewritten Code
+```python
+def add(first, second):
+    \"\"\"Return the sum of two numbers.\"\"\"
+    return first + second
+```
+"""
+
+
+# ==================================================
+# CONFIGURATION
+# ==================================================
+class LatencyModel:
+    """
+    Samples seconds from a named distribution:
+    ``fixed``, ``uniform`` (mean +/- jitter) or ``lognormal``
+    (median ``mean``, shape ``sigma``).
+    """
+
+    def __init__(
+        self,
+        distribution: str = "lognormal",
+        mean: float = 0.2,
+        jitter: float = 0.1,
+        sigma: float = 0.5
+    ):
+        if distribution not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean = mean
+        self.jitter = jitter
+        self.sigma = sigma
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "fixed":
+            return self.mean
+        if self.distribution == "uniform":
+            return max(0.0, rng.uniform(self.mean - self.jitter, self.mean + self.jitter))
+        return rng.lognormvariate(0.0, self.sigma) * self.mean
+
+
+class FakeGroqConfig:
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        chunk_delay: float = 0.005,
+        chunk_size: int = 16,
+        error_429_rate: float = 0.0,
+        error_500_rate: float = 0.0,
+        retry_after: float = 0.2,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency or LatencyModel()
+        self.chunk_delay = chunk_delay
+        self.chunk_size = max(1, chunk_size)
+        self.error_429_rate = error_429_rate
+        self.error_500_rate = error_500_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+
+# ==================================================
+# CANNED RESPONSES
+# ==================================================
+def classify_prompt(messages: List[Dict[str, Any]]) -> str:
+    """
+    Recognise which app flow a request comes from by its prompt.
+    """
+    user = next(
+        (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"),
+        ""
+    )
+    if "STRICTLY in valid JSON" in user:
+        return "blueprint"
+    if "EXPLANATION:" in user:
+        return "code_with_explanation"
+    if "Review the following Python code" in user:
+        return "review"
+    return "code"
+
+
+def canned_response(kind: str) -> str:
+    if kind == "blueprint":
+        # Models often wrap the JSON in prose and a code fence
+        return f"Here is the blueprint:\n```json\n{json.dumps(BLUEPRINT_JSON, indent=2)}\n```"
+    if kind == "code_with_explanation":
+        return (
+            f"CODE:\n{PYTHON_FILE}\nEXPLANATION:\n"
+            "load_tasks reads the saved list and add_task appends a new entry."
+        )
+    if kind == "review":
+        return REVIEW_MARKDOWN
+    return PYTHON_FILE
+
+
+# ==================================================
+# SERVER
+# ==================================================
+class FakeGroqServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server; ``start()`` serves in a daemon thread.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[FakeGroqConfig] = None):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeGroqConfig()
+        self.rng = random.Random(self.config.seed)
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def draw(self) -> Dict[str, float]:
+        """
+        One locked draw from the shared RNG per request.
+        """
+        with self._lock:
+            return {
+                "latency": self.config.latency.sample(self.rng),
+                "fault": self.rng.random()
+            }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def start(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeGroqServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeGroqServer
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---------------- HELPERS ----------------
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self._send_json(
+            status,
+            {"error": {"message": message, "type": "fake_error", "code": str(status)}},
+            headers
+        )
+
+    # ---------------- ENDPOINT ----------------
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+
+        if self.path.rstrip("/") != COMPLETIONS_PATH:
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+
+        try:
+            request = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "Invalid JSON body")
+            return
+
+        server = self.server
+        config = server.config
+        draw = server.draw()
+        server.count("requests")
+
+        # Injected failures answer quickly, like a real gateway
+        if draw["fault"] < config.error_429_rate:
+            server.count("injected_429")
+            self._send_error(
+                429,
+                "Rate limit reached",
+                {"retry-after": f"{config.retry_after:g}"}
+            )
+            return
+        if draw["fault"] < config.error_429_rate + config.error_500_rate:
+            server.count("injected_500")
+            self._send_error(500, "Internal server error")
+            return
+
+        kind = classify_prompt(request.get("messages", []))
+        server.count(kind)
+        content = canned_response(kind)
+        model = request.get("model", "fake-model")
+        prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4
+        }
+
+        time.sleep(draw["latency"])
+
+        if request.get("stream"):
+            self._stream(content, model, usage)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+    def _stream(self, content: str, model: str, usage: Dict[str, int]):
+        config = self.server.config
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        def event(delta: Dict[str, Any], finish: Optional[str] = None, extra: Optional[Dict] = None) -> bytes:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+            }
+            if extra:
+                chunk.update(extra)
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        try:
+            self.wfile.write(event({"role": "assistant", "content": ""}))
+            for start in range(0, len(content), config.chunk_size):
+                self.wfile.write(event({"content": content[start:start + config.chunk_size]}))
+                self.wfile.flush()
+                if config.chunk_delay:
+                    time.sleep(config.chunk_delay)
+            # Groq reports usage on the final chunk under x_groq
+            self.wfile.write(event({}, "stop", {"x_groq": {"id": completion_id, "usage": usage}}))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count("client_disconnects")
+        self.close_connection = True
+
+
+# ==================================================
+# CLI
+# ==================================================
+def add_server_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=0.2, help="seconds (median for lognormal)")
+    parser.add_argument("--latency-jitter", type=float, default=0.1)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--chunk-delay", type=float, default=0.005)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--error-429", type=float, default=0.0, help="fraction of requests")
+    parser.add_argument("--error-500", type=float, default=0.0, help="fraction of requests")
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeGroqConfig:
+    return FakeGroqConfig(
+        latency=LatencyModel(
+            args.latency, args.latency_mean, args.latency_jitter, args.latency_sigma
+        ),
+        chunk_delay=args.chunk_delay,
+        chunk_size=args.chunk_size,
+        error_429_rate=args.error_429,
+        error_500_rate=args.error_500,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(args.host, args.port, config_from_args(args))
+    print(f"Fake Groq server on {server.base_url}{COMPLETIONS_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
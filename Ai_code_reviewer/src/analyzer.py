@@ -1,14 +1,318 @@
 import ast
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
+
+from src.incremental import IncrementalAnalysisCache, split_segments
+
+
+# Fields never worth descending into (expression contexts)
+_SKIPPED_FIELDS = {"ctx"}
+_FIELDS_CACHE: Dict[type, Tuple[str, ...]] = {}
+
+
+def _child_fields(node_type: type) -> Tuple[str, ...]:
+    fields = _FIELDS_CACHE.get(node_type)
+    if fields is None:
+        fields = tuple(f for f in node_type._fields if f not in _SKIPPED_FIELDS)
+        _FIELDS_CACHE[node_type] = fields
+    return fields
+
+
+def _has_docstring(node: ast.AST) -> bool:
+    body = node.body
+    return bool(body) and isinstance(body[0], ast.Expr) and \
+        isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)
+
+
+def _summary(node: ast.AST) -> str:
+    docstring = ast.get_docstring(node) if _has_docstring(node) else None
+    return f"  # {docstring.strip().splitlines()[0]}" if docstring and docstring.strip() else ""
+
+
+def _function_signature(node: ast.AST, indent: str = "") -> str:
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    decorators = "".join(f"{indent}@{ast.unparse(d)}\n" for d in node.decorator_list)
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+    return (
+        f"{decorators}{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+        f"{_summary(node)}"
+    )
+
+
+def _class_signature(node: ast.ClassDef) -> List[str]:
+    decorators = [f"@{ast.unparse(d)}" for d in node.decorator_list]
+    bases = ", ".join(ast.unparse(b) for b in [*node.bases, *node.keywords])
+    lines = [*decorators, f"class {node.name}{f'({bases})' if bases else ''}:{_summary(node)}"]
+
+    for item in node.body:
+        if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+            lines.append(f"    {item.target.id}: {ast.unparse(item.annotation)}")
+        elif isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not item.name.startswith("_") or item.name == "__init__":
+                lines.append(_function_signature(item, "    "))
+    return lines
+
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _start_line(node: ast.stmt) -> int:
+    # Decorators belong to the definition they precede
+    return min([node.lineno, *(d.lineno for d in getattr(node, "decorator_list", []))])
+
+
+def _line_chunks(
+    body: List[ast.stmt],
+    lines: List[str],
+    first: int,
+    last: int,
+    prefix: str,
+    max_chars: Optional[int]
+) -> List[Dict[str, Any]]:
+    """
+    Cut lines ``first``..``last`` (1-based) of a statement list into
+    chunks at every definition and at every plain statement that
+    follows one. Lines between statements (comments, blank lines) stay
+    with the chunk before them.
+    """
+    starts: List[Tuple[int, Optional[ast.stmt]]] = []
+    previous_is_definition = True
+    for node in body:
+        is_definition = isinstance(node, _DEFINITIONS)
+        if is_definition or previous_is_definition:
+            starts.append((_start_line(node), node if is_definition else None))
+        previous_is_definition = is_definition
+    if not starts:
+        return []
+    starts[0] = (first, starts[0][1])
+
+    chunks = []
+    for index, (start, node) in enumerate(starts):
+        end = starts[index + 1][0] - 1 if index + 1 < len(starts) else last
+        source = "\n".join(lines[start - 1:end])
+        name = f"{prefix}{node.name}" if node is not None else f"{prefix}<statements>"
+
+        methods = [item for item in getattr(node, "body", []) if isinstance(item, _DEFINITIONS)]
+        if isinstance(node, ast.ClassDef) and max_chars and len(source) > max_chars and methods:
+            # The header keeps the class line, docstring and attributes
+            header = _start_line(methods[0])
+            chunks.append({
+                "name": name,
+                "line": start,
+                "source": "\n".join(lines[start - 1:header - 1])
+            })
+            inner = node.body[node.body.index(methods[0]):]
+            chunks.extend(_line_chunks(inner, lines, header, end, f"{name}.", max_chars))
+            continue
+
+        chunks.append({"name": name, "line": start, "source": source})
+    return chunks
+
+
+class _AnalysisVisitor:
+    """
+    Single-pass, type-dispatched AST visitor.
+
+    Handlers are looked up once per node type; every node is
+    visited exactly once. Per-function metrics are accumulated on
+    the innermost enclosing function record, which is passed to
+    ``emit("function", record)`` once its body has been visited;
+    assigned names go to ``emit("variable", name)``.
+    """
+
+    def __init__(self, emit: Optional[Callable[[str, Any], None]] = None):
+        self.emit = emit
+        self.functions: List[Dict[str, Any]] = []
+        self.variables: List[str] = []
+        self.imports: List[str] = []
+        self.loops: int = 0
+
+        self._function: Optional[Dict[str, Any]] = None
+        self._depth = 0
+        self._dispatch: Dict[type, Callable[[ast.AST], None]] = {}
+
+    # ---------------- DISPATCH ----------------
+    def visit(self, node: ast.AST):
+        handler = self._dispatch.get(node.__class__)
+        if handler is None:
+            handler = getattr(
+                self, "visit_" + node.__class__.__name__, self.generic_visit
+            )
+            self._dispatch[node.__class__] = handler
+        handler(node)
+
+    def generic_visit(self, node: ast.AST):
+        visit = self.visit
+        for field in _child_fields(node.__class__):
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        visit(item)
+            elif isinstance(value, ast.AST):
+                visit(value)
+
+    def _visit_all(self, nodes: List[ast.AST]):
+        for node in nodes:
+            self.visit(node)
+
+    # ---------------- METRIC HELPERS ----------------
+    def _add_complexity(self, amount: int = 1):
+        if self._function is not None:
+            self._function["complexity"] += amount
+
+    def _enter_block(self):
+        self._depth += 1
+        if self._function is not None and self._depth > self._function["max_nesting"]:
+            self._function["max_nesting"] = self._depth
+
+    def _visit_block(self, node: ast.AST):
+        self._enter_block()
+        self.generic_visit(node)
+        self._depth -= 1
+
+    # ---------------- FUNCTIONS ----------------
+    def visit_FunctionDef(self, node: ast.AST):
+        record = {
+            "name": node.name,
+            "line": node.lineno,
+            "length": (node.end_lineno or node.lineno) - node.lineno,
+            "has_docstring": _has_docstring(node),
+            "is_async": isinstance(node, ast.AsyncFunctionDef),
+            "complexity": 1,
+            "max_nesting": 0,
+            "loops": 0
+        }
+        self.functions.append(record)
+
+        # Decorators, defaults and annotations belong to the outer scope
+        self._visit_all(node.decorator_list)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+
+        outer = (self._function, self._depth)
+        self._function, self._depth = record, 0
+        self._visit_all(node.body)
+        self._function, self._depth = outer
+        if self.emit:
+            self.emit("function", record)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    # ---------------- BRANCHES ----------------
+    def visit_If(self, node: ast.If):
+        self._add_complexity()
+        self.visit(node.test)
+        self._enter_block()
+        self._visit_all(node.body)
+        self._depth -= 1
+
+        # `elif` chains stay at the same nesting level
+        if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+            self.visit(node.orelse[0])
+        else:
+            self._enter_block()
+            self._visit_all(node.orelse)
+            self._depth -= 1
+
+    def visit_IfExp(self, node: ast.IfExp):
+        self._add_complexity()
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node: ast.BoolOp):
+        self._add_complexity(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        self._add_complexity()
+        self.generic_visit(node)
+
+    def visit_match_case(self, node: ast.AST):
+        self._add_complexity()
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node: ast.comprehension):
+        self._add_complexity(1 + len(node.ifs))
+        self.generic_visit(node)
+
+    # ---------------- LOOPS ----------------
+    def visit_For(self, node: ast.AST):
+        self.loops += 1
+        if self._function is not None:
+            self._function["loops"] += 1
+        self._add_complexity()
+        self._visit_block(node)
+
+    visit_AsyncFor = visit_For
+    visit_While = visit_For
+
+    # ---------------- OTHER BLOCKS ----------------
+    def visit_With(self, node: ast.AST):
+        self._visit_block(node)
+
+    visit_AsyncWith = visit_With
+    visit_Try = visit_With
+    visit_TryStar = visit_With
+    visit_Match = visit_With
+
+    # ---------------- ASSIGNMENTS ----------------
+    def _variable(self, name: str):
+        self.variables.append(name)
+        if self.emit:
+            self.emit("variable", name)
+
+    def visit_Assign(self, node: ast.Assign):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self._variable(target.id)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AST):
+        if isinstance(node.target, ast.Name):
+            self._variable(node.target.id)
+        self.generic_visit(node)
+
+    visit_AugAssign = visit_AnnAssign
+
+    # ---------------- IMPORTS ----------------
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self.imports.append(node.module)
 
 
 class CodeAnalyzer:
     """
-    Analyzes Python source code using AST
+    Analyzes Python source code using AST.
+
+    When an IncrementalAnalysisCache is given, unchanged top-level
+    definitions reuse their cached analysis.
+
+    ``on_event(event, payload)`` is called while the analysis runs,
+    so rules can subscribe instead of re-reading the result lists:
+
+    - error:    a syntax error message
+    - function: a function record, once its body has been visited
+    - variable: an assigned name, the first time it is seen
+    - module:   the whole result, once at the end
+
+    Functions and variables of cached definitions are replayed from
+    the cache.
     """
 
-    def __init__(self, code: str):
+    def __init__(
+        self,
+        code: str,
+        cache: Optional[IncrementalAnalysisCache] = None,
+        on_event: Optional[Callable[[str, Any], None]] = None
+    ):
         self.code = code
+        self.cache = cache
+        self.on_event = on_event
+        self._seen_variables: Set[str] = set()
         self.tree = None
         self.errors: List[str] = []
         self.functions: List[Dict[str, Any]] = []
@@ -16,6 +320,13 @@ class CodeAnalyzer:
         self.imports: List[str] = []
         self.loops: int = 0
 
+    def _emit(self, event: str, payload: Any):
+        if event == "variable":
+            if payload in self._seen_variables:
+                return
+            self._seen_variables.add(payload)
+        self.on_event(event, payload)
+
     # ---------------- PARSE CODE ----------------
     def parse_code(self) -> bool:
         """
@@ -28,62 +339,158 @@ class CodeAnalyzer:
             self.errors.append(
                 f"Syntax Error (line {e.lineno}): {e.msg}"
             )
+            if self.on_event:
+                self._emit("error", self.errors[-1])
             return False
 
     # ---------------- ANALYZE AST ----------------
     def analyze(self):
         """
-        Walk through AST nodes and collect info
+        Visit every AST node once and collect info.
+
+        Each function record holds its line span ("length"),
+        cyclomatic complexity, max nesting depth and loop count.
         """
         if not self.tree:
             return
 
-        for node in ast.walk(self.tree):
+        visitor = _AnalysisVisitor(self._emit if self.on_event else None)
+        visitor.visit(self.tree)
+
+        self.functions.extend(visitor.functions)
+        self.variables.extend(visitor.variables)
+        self.imports.extend(visitor.imports)
+        self.loops += visitor.loops
+
+    def _analyze_incremental(self) -> bool:
+        """
+        Analyze each top-level definition separately. Definitions
+        whose source hash is cached are neither parsed nor visited.
+
+        A segment that does not parse on its own (a split inside a
+        string, or a real syntax error) is merged with the next one.
+        Returns False (and leaves results untouched) when the tail
+        still fails, so the caller can do a full parse.
+        """
+        functions, variables, imports, loops = [], [], [], 0
+        segments = split_segments(self.code)
+        index = 0
+
+        while index < len(segments):
+            start, source = segments[index]
+            index += 1
+            segment = self.cache.get_segment(source)
 
-            # Function definitions
-            if isinstance(node, ast.FunctionDef):
-                self.functions.append({
-                    "name": node.name,
-                    "line": node.lineno,
-                    "length": len(node.body),
-                    "has_docstring": ast.get_docstring(node) is not None
-                })
+            while segment is None:
+                try:
+                    tree = ast.parse(source)
+                    break
+                except SyntaxError:
+                    if index == len(segments):
+                        return False
+                    source += "\n" + segments[index][1]
+                    index += 1
+                    segment = self.cache.get_segment(source)
 
-            # Variable assignments
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        self.variables.append(target.id)
+            if segment is None:
 
-            # Import statements
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    self.imports.append(alias.name)
+                visitor = _AnalysisVisitor()
+                visitor.visit(tree)
+                segment = {
+                    "functions": [
+                        dict(func, line=func["line"] - 1)
+                        for func in visitor.functions
+                    ],
+                    "variables": visitor.variables,
+                    "imports": visitor.imports,
+                    "loops": visitor.loops
+                }
+                self.cache.put_segment(source, segment)
 
-            if isinstance(node, ast.ImportFrom):
-                if node.module:
-                    self.imports.append(node.module)
+            functions.extend(
+                dict(func, line=func["line"] + start)
+                for func in segment["functions"]
+            )
+            variables.extend(segment["variables"])
+            imports.extend(segment["imports"])
+            loops += segment["loops"]
+
+        self.functions.extend(functions)
+        self.variables.extend(variables)
+        self.imports.extend(imports)
+        self.loops += loops
+
+        # Only once every segment parsed: a fallback to the full
+        # parse would emit everything again
+        if self.on_event:
+            for func in functions:
+                self._emit("function", func)
+            for name in variables:
+                self._emit("variable", name)
+        return True
+
+    # ---------------- SIGNATURES ----------------
+    def signature_digest(self) -> str:
+        """
+        Compact public API of the module: top-level functions and
+        classes (with their public methods and annotated fields) as
+        signature lines, plus module constants, each with the first
+        line of its docstring. Empty when the code does not parse.
+        """
+        if self.tree is None and not self.parse_code():
+            return ""
+
+        lines: List[str] = []
+        for node in self.tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if not node.name.startswith("_"):
+                    lines.append(_function_signature(node))
+            elif isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+                lines.extend(_class_signature(node))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        lines.append(target.id)
+        return "\n".join(lines)
+
+    # ---------------- CHUNKS ----------------
+    def top_level_chunks(self, max_chars: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Split the module on top-level function and class boundaries,
+        as {"name", "line", "source"} dicts in source order. Each
+        definition (with its decorators) is one chunk and each run of
+        other statements is another, so every line lands in exactly
+        one chunk. A class longer than ``max_chars`` is split again
+        into its header and one chunk per method ("Class.method").
+        Empty when the code does not parse.
+        """
+        if self.tree is None and not self.parse_code():
+            return []
 
-            # Loops
-            if isinstance(node, (ast.For, ast.While)):
-                self.loops += 1
+        lines = self.code.splitlines()
+        return _line_chunks(self.tree.body, lines, 1, len(lines), "", max_chars)
 
     # ---------------- MAIN ENTRY ----------------
     def run(self) -> Dict[str, Any]:
         """
         Run full analysis
         """
-        parsed = self.parse_code()
-        if parsed:
-            self.analyze()
+        if self.cache is None or not self._analyze_incremental():
+            parsed = self.parse_code()
+            if parsed:
+                self.analyze()
 
-        return {
+        result = {
             "errors": self.errors,
             "functions": self.functions,
             "variables": list(set(self.variables)),
             "imports": list(set(self.imports)),
             "loops": self.loops
         }
+        if self.on_event:
+            self._emit("module", result)
+        return result
 
 
 # ---------------- QUICK TEST ----------------
@@ -0,0 +1,209 @@
+import heapq
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.analyzer import CodeAnalyzer
+from src.rules import CodeReviewRules
+from src.rewriter import CodeRewriter
+from src.utils import calculate_quality_score
+
+
+# ==================================================
+# SINGLE FILE TASK (RUNS IN A WORKER PROCESS)
+# ==================================================
+def review_source(path: str, code: str) -> Dict[str, Any]:
+    """
+    Run analyzer -> rules -> rewriter -> score on one file.
+    """
+    rules = CodeReviewRules()
+    analysis = CodeAnalyzer(code, on_event=rules.on_event).run()
+    feedback = rules.run_all()
+    rewrite_diff = CodeRewriter(code).rewrite_diff()
+
+    severities: Dict[str, int] = {}
+    for finding in rules.findings:
+        severities[finding.severity] = severities.get(finding.severity, 0) + 1
+
+    return {
+        "path": path,
+        "score": calculate_quality_score(analysis, rules.findings),
+        "feedback": feedback,
+        "severities": severities,
+        "rewrite_diff": rewrite_diff,
+        "functions": len(analysis["functions"]),
+        "loops": analysis["loops"],
+        "has_errors": bool(analysis["errors"])
+    }
+
+
+# ==================================================
+# SOURCE READERS
+# ==================================================
+def iter_zip_sources(
+    archive: Union[str, Path, IO[bytes]],
+    max_file_bytes: int = 1_000_000
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (member name, source) for every .py member of a zip,
+    one member at a time, without extracting to disk.
+    Members larger than max_file_bytes are skipped.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.endswith(".py"):
+                continue
+            if info.file_size > max_file_bytes:
+                continue
+            yield info.filename, zf.read(info).decode("utf-8", errors="replace")
+
+
+def iter_directory_sources(
+    root: Union[str, Path],
+    max_file_bytes: int = 1_000_000
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (relative path, source) for every .py file under root.
+    """
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            path = Path(dirpath) / filename
+            if path.stat().st_size > max_file_bytes:
+                continue
+            yield (
+                path.relative_to(root).as_posix(),
+                path.read_text(encoding="utf-8", errors="replace")
+            )
+
+
+# ==================================================
+# BATCH ENGINE
+# ==================================================
+class BatchReviewer:
+    """
+    Reviews many files in parallel on a process pool.
+
+    Sources are consumed lazily and at most ``max_pending`` files
+    are in flight at once, so memory stays bounded no matter how
+    many files an archive contains. Results are yielded in
+    completion order.
+
+    Pass a long-lived ``executor`` to reuse warm worker processes
+    across batches; it is then left running after each batch.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_pending: int = None,
+        executor: Optional[Executor] = None
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 2
+        self.executor = executor
+
+    def review(self, sources: Iterable[Tuple[str, str]]) -> Iterator[Dict[str, Any]]:
+        sources = iter(sources)
+        owned = self.executor is None
+        pool = ProcessPoolExecutor(max_workers=self.max_workers) if owned else self.executor
+        pending = {}
+
+        try:
+
+            def fill():
+                while len(pending) < self.max_pending:
+                    try:
+                        path, code = next(sources)
+                    except StopIteration:
+                        return
+                    pending[pool.submit(review_source, path, code)] = path
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield {"path": path, "error": str(e)}
+                fill()
+        finally:
+            # Abandoned batches must not keep a shared pool busy
+            for future in pending:
+                future.cancel()
+            if owned:
+                pool.shutdown(cancel_futures=True)
+
+    def review_zip(self, archive, max_file_bytes: int = 1_000_000) -> Iterator[Dict[str, Any]]:
+        return self.review(iter_zip_sources(archive, max_file_bytes))
+
+    def review_directory(self, root, max_file_bytes: int = 1_000_000) -> Iterator[Dict[str, Any]]:
+        return self.review(iter_directory_sources(root, max_file_bytes))
+
+
+# ==================================================
+# AGGREGATE REPORT
+# ==================================================
+class BatchReport:
+    """
+    Running aggregate over per-file results.
+
+    Only counters and the ``worst`` lowest-scoring files are kept,
+    not the results themselves.
+    """
+
+    def __init__(self, worst: int = 10):
+        self.worst = worst
+        self.files = 0
+        self.failed: List[str] = []
+        self.total_score = 0
+        self.syntax_errors = 0
+        self.functions = 0
+        self.loops = 0
+        self.severity = {"error": 0, "warning": 0, "info": 0}
+        self._lowest: List[Tuple[int, str]] = []
+
+    def add(self, result: Dict[str, Any]):
+        if "error" in result:
+            self.failed.append(result["path"])
+            return
+
+        self.files += 1
+        self.total_score += result["score"]
+        self.syntax_errors += int(result["has_errors"])
+        self.functions += result["functions"]
+        self.loops += result["loops"]
+
+        for severity in self.severity:
+            self.severity[severity] += result["severities"].get(severity, 0)
+
+        # Min-heap on negated score keeps the lowest scores seen so far
+        item = (-result["score"], result["path"])
+        if len(self._lowest) < self.worst:
+            heapq.heappush(self._lowest, item)
+        else:
+            heapq.heappushpop(self._lowest, item)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "failed": self.failed,
+            "average_score": round(self.total_score / self.files, 1) if self.files else 0,
+            "syntax_errors": self.syntax_errors,
+            "functions": self.functions,
+            "loops": self.loops,
+            "errors": self.severity["error"],
+            "warnings": self.severity["warning"],
+            "info": self.severity["info"],
+            "lowest_scores": [
+                {"path": path, "score": -score}
+                for score, path in sorted(self._lowest, reverse=True)
+            ]
+        }
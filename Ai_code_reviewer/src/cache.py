@@ -0,0 +1,434 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from src.utils import get_data_dir
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value cache with LRU eviction.
+
+    - Entries older than ``max_age`` seconds are dropped
+    - Least recently used entries are evicted once the cache holds
+      more than ``max_entries`` rows or ``max_bytes`` of values
+    - WAL journaling + busy timeout make a single file safe to
+      share between several processes (e.g. Streamlit workers)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._init_db()
+
+    # ---------------- CONNECTION ----------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_accessed "
+                "ON entries(accessed_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                " name TEXT PRIMARY KEY,"
+                " value INTEGER NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    # ---------------- READ ----------------
+    def get(self, key: str, record: bool = True) -> Optional[str]:
+        """
+        With record=False the lookup is not counted as a hit or miss
+        (the caller decides, see BlueprintCache).
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] > self.max_age:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+
+            if row:
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            if record:
+                self._record(conn, bool(row))
+        finally:
+            conn.close()
+
+        return row[0] if row else None
+
+    # ---------------- WRITE ----------------
+    def set(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def delete(self, key: str):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+        finally:
+            conn.close()
+
+    # ---------------- EVICTION ----------------
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute(
+            "DELETE FROM entries WHERE created_at < ?", (now - self.max_age,)
+        )
+
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        excess_rows = max(count - self.max_entries, 0)
+        excess_bytes = max(total - self.max_bytes, 0)
+        victims = []
+        freed = 0
+
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ):
+            if len(victims) >= excess_rows and freed >= excess_bytes:
+                break
+            victims.append((key,))
+            freed += size
+
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    # ---------------- STATS ----------------
+    def _record(self, conn: sqlite3.Connection, hit: bool, saved_ms: int = 0):
+        self._count(conn, "hits" if hit else "misses")
+        if saved_ms:
+            self._count(conn, "saved_ms", saved_ms)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _count(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Process-local and shared (all processes) cache statistics.
+        """
+        conn = self._connect()
+        try:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM counters"))
+        finally:
+            conn.close()
+
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": counters.get("hits", 0),
+            "shared_misses": counters.get("misses", 0)
+        }
+
+
+class LLMResponseCache(DiskCache):
+    """
+    Content-addressed cache of LLM completions, keyed on
+    (model name, system prompt, user prompt, temperature).
+    """
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float
+    ) -> str:
+        payload = json.dumps(
+            [model_name, system_prompt, user_prompt, temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BlueprintCache(DiskCache):
+    """
+    Project blueprints keyed on a normalized prompt plus the detected
+    interaction mode, so rephrasings that differ only in case,
+    whitespace or punctuation skip the blueprint LLM call.
+
+    Each entry remembers how long the LLM took to produce it; a hit
+    adds that to the saved-latency counters. Entries that fail
+    ``validate`` are dropped and count as misses.
+    """
+
+    def __init__(self, path: Union[str, Path], validate=None, **limits):
+        super().__init__(path, **limits)
+        self.validate = validate
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        text = re.sub(r"[\W_]+", " ", prompt.lower())
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, prompt: str, interaction_mode: str) -> str:
+        payload = json.dumps([cls.normalize_prompt(prompt), interaction_mode])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_blueprint(
+        self,
+        prompt: str,
+        interaction_mode: str
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        (blueprint, seconds saved), or (None, 0.0) on a miss.
+        """
+        key = self.make_key(prompt, interaction_mode)
+        value = self.get(key, record=False)
+
+        blueprint = None
+        saved = 0.0
+        if value is not None:
+            try:
+                entry = json.loads(value)
+                if self.validate is None or self.validate(entry["blueprint"], interaction_mode):
+                    blueprint = entry["blueprint"]
+                    saved = float(entry.get("seconds", 0.0))
+            except (ValueError, KeyError, TypeError):
+                pass
+            if blueprint is None:
+                self.delete(key)
+
+        conn = self._connect()
+        try:
+            self._record(conn, blueprint is not None, int(saved * 1000))
+        finally:
+            conn.close()
+        with self._lock:
+            self.saved_seconds += saved
+        return blueprint, saved
+
+    def set_blueprint(
+        self,
+        prompt: str,
+        interaction_mode: str,
+        blueprint: Dict[str, Any],
+        seconds: float
+    ):
+        self.set(
+            self.make_key(prompt, interaction_mode),
+            json.dumps({"blueprint": blueprint, "seconds": round(seconds, 3)})
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM counters WHERE name = 'saved_ms'"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        lookups = stats["shared_hits"] + stats["shared_misses"]
+        stats.update({
+            "saved_seconds": round(self.saved_seconds, 3),
+            "shared_saved_seconds": round((row[0] if row else 0) / 1000, 3),
+            "hit_rate": round(stats["shared_hits"] / lookups, 3) if lookups else 0.0
+        })
+        return stats
+
+
+class ReviewResultCache:
+    """
+    End-to-end Code Review results (findings, score, rewrite and LLM
+    markdown), keyed on the code plus the rule settings.
+
+    A bounded per-process LRU sits in front of a shared DiskCache: a
+    repeat in the same process never touches SQLite, and other
+    processes (Streamlit workers, the CLI) still share results.
+    Entries are kept as JSON, so callers always get a fresh copy.
+    """
+
+    # Bump when the shape or meaning of a cached review changes
+    VERSION = 1
+
+    def __init__(self, store: Optional[DiskCache] = None, max_entries: int = 256):
+        self.store = store
+        self.max_entries = max_entries
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def make_key(cls, code: str, rule_settings: Any) -> str:
+        payload = json.dumps(
+            [cls.VERSION, code, rule_settings],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(value)
+
+        value = self.store.get(key) if self.store is not None else None
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        self._remember(key, value)
+        with self._lock:
+            self.store_hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        value = json.dumps(entry, ensure_ascii=False)
+        self._remember(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def _remember(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses
+            }
+
+
+_default_llm_cache: Optional[LLMResponseCache] = None
+_default_blueprint_cache: Optional[BlueprintCache] = None
+_default_review_cache: Optional[ReviewResultCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_llm_cache() -> LLMResponseCache:
+    """
+    Process-wide LLM response cache stored in the data directory.
+    """
+    global _default_llm_cache
+    with _default_lock:
+        if _default_llm_cache is None:
+            _default_llm_cache = LLMResponseCache(
+                get_data_dir() / "llm_cache.sqlite3"
+            )
+        return _default_llm_cache
+
+
+def get_blueprint_cache() -> BlueprintCache:
+    """
+    Process-wide blueprint cache stored in the data directory.
+    """
+    from src.project_builder.blueprint import validate_blueprint
+
+    global _default_blueprint_cache
+    with _default_lock:
+        if _default_blueprint_cache is None:
+            _default_blueprint_cache = BlueprintCache(
+                get_data_dir() / "blueprint_cache.sqlite3",
+                validate=validate_blueprint
+            )
+        return _default_blueprint_cache
+
+
+def get_review_cache() -> ReviewResultCache:
+    """
+    Process-wide review result cache; its shared store lives in the
+    data directory.
+    """
+    global _default_review_cache
+    with _default_lock:
+        if _default_review_cache is None:
+            _default_review_cache = ReviewResultCache(
+                DiskCache(get_data_dir() / "review_cache.sqlite3", max_entries=2000)
+            )
+        return _default_review_cache
@@ -0,0 +1,326 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.utils import get_data_dir
+
+REVIEW = "review"
+GENERATION = "generation"
+BUILD = "build"
+
+
+class HistoryStore:
+    """
+    SQLite-backed history of reviews, code generations and builds.
+
+    - ``history`` rows hold the listing fields (owner, time, mode,
+      title, project name, score) and are indexed for the sidebar
+      queries
+    - Every entry belongs to an ``owner`` (the app uses one id per
+      browser session); reads given an owner only see its entries,
+      so sessions cannot list or replay each other's code and prompts
+    - Full results live in ``artifacts``, zlib-compressed and keyed on
+      the SHA-256 of their content, so identical results are stored
+      once and any entry can be replayed without calling the LLM
+    - Retention: entries older than ``max_age`` seconds, owners with
+      no new entry for ``owner_max_idle`` seconds (abandoned ids) and
+      entries beyond the newest ``max_entries`` are dropped, then the
+      oldest until the artifacts fit in ``max_bytes``; unreferenced
+      artifacts go too
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 1000,
+        max_bytes: int = 100 * 1024 * 1024,
+        max_age: float = 90 * 24 * 3600,
+        owner_max_idle: float = 30 * 24 * 3600
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.owner_max_idle = owner_max_idle
+        self._init_db()
+
+    # ---------------- CONNECTION ----------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " owner TEXT NOT NULL DEFAULT '',"
+                " mode TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " title TEXT NOT NULL,"
+                " project_name TEXT,"
+                " score INTEGER,"
+                " meta TEXT NOT NULL,"
+                " artifact TEXT NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(history)")}
+            if "owner" not in columns:
+                # Stores created before entries had owners
+                conn.execute("ALTER TABLE history ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_owner_mode_created "
+                "ON history(owner, mode, created_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_created "
+                "ON history(created_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_mode_created "
+                "ON history(mode, created_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_project "
+                "ON history(project_name)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_artifact "
+                "ON history(artifact)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                " digest TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    # ---------------- WRITE ----------------
+    def record(
+        self,
+        mode: str,
+        title: str,
+        artifact: Dict[str, Any],
+        project_name: Optional[str] = None,
+        score: Optional[int] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        owner: str = ""
+    ) -> int:
+        """
+        Store one entry and its full result; returns the entry id.
+        """
+        payload = json.dumps(artifact, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        data = zlib.compress(payload, 6)
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR IGNORE INTO artifacts (digest, data, size) VALUES (?, ?, ?)",
+                (digest, data, len(data))
+            )
+            cursor = conn.execute(
+                "INSERT INTO history "
+                "(owner, mode, created_at, title, project_name, score, meta, artifact) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (owner, mode, now, title, project_name, score, json.dumps(meta or {}), digest)
+            )
+            self._apply_retention(conn, now)
+            conn.execute("COMMIT")
+            return cursor.lastrowid
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _apply_retention(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM history WHERE created_at < ?", (now - self.max_age,))
+        conn.execute(
+            "DELETE FROM history WHERE owner IN "
+            "(SELECT owner FROM history GROUP BY owner HAVING MAX(created_at) < ?)",
+            (now - self.owner_max_idle,)
+        )
+        conn.execute(
+            "DELETE FROM history WHERE id NOT IN "
+            "(SELECT id FROM history ORDER BY created_at DESC, id DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._drop_orphans(conn)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = conn.execute(
+                "SELECT id FROM history ORDER BY created_at, id LIMIT 2"
+            ).fetchall()
+            # Keep the newest entry even if it alone exceeds the budget
+            if len(oldest) < 2:
+                break
+            conn.execute("DELETE FROM history WHERE id = ?", (oldest[0][0],))
+            self._drop_orphans(conn)
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+
+    @staticmethod
+    def _drop_orphans(conn: sqlite3.Connection):
+        conn.execute(
+            "DELETE FROM artifacts WHERE NOT EXISTS "
+            "(SELECT 1 FROM history WHERE history.artifact = artifacts.digest)"
+        )
+
+    def delete(self, entry_id: int, owner: Optional[str] = None):
+        where, params = self._filters(None, None, owner)
+        where = f"{where} AND id = ?" if where else " WHERE id = ?"
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"DELETE FROM history{where}", (*params, entry_id))
+            self._drop_orphans(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def clear(self, owner: Optional[str] = None):
+        """
+        Drop every entry, or only ``owner``'s.
+        """
+        where, params = self._filters(None, None, owner)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"DELETE FROM history{where}", params)
+            self._drop_orphans(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ---------------- READ ----------------
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["meta"] = json.loads(entry["meta"])
+        return entry
+
+    def count(
+        self,
+        mode: Optional[str] = None,
+        project_name: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> int:
+        where, params = self._filters(mode, project_name, owner)
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def list(
+        self,
+        mode: Optional[str] = None,
+        page: int = 0,
+        page_size: int = 10,
+        project_name: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest-first page of entries (without their artifacts).
+        ``owner=None`` lists every owner's entries.
+        """
+        where, params = self._filters(mode, project_name, owner)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, owner, mode, created_at, title, project_name, score, meta, artifact "
+                f"FROM history{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (*params, page_size, page * page_size)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [self._row(row) for row in rows]
+
+    @staticmethod
+    def _filters(mode: Optional[str], project_name: Optional[str], owner: Optional[str] = None):
+        clauses, params = [], []
+        if owner is not None:
+            clauses.append("owner = ?")
+            params.append(owner)
+        if mode is not None:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if project_name is not None:
+            clauses.append("project_name = ?")
+            params.append(project_name)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def get(self, entry_id: int, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        One entry with its full result under ``"artifact"``; None if
+        it does not exist or belongs to another owner.
+        """
+        query = (
+            "SELECT history.*, artifacts.data FROM history "
+            "JOIN artifacts ON artifacts.digest = history.artifact "
+            "WHERE history.id = ?"
+        )
+        params: List[Any] = [entry_id]
+        if owner is not None:
+            query += " AND history.owner = ?"
+            params.append(owner)
+
+        conn = self._connect()
+        try:
+            row = conn.execute(query, params).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+
+        entry = dict(row)
+        entry["meta"] = json.loads(entry["meta"])
+        entry["digest"] = entry["artifact"]
+        entry["artifact"] = json.loads(zlib.decompress(entry.pop("data")))
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            artifacts, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {"entries": entries, "artifacts": artifacts, "bytes": size}
+
+
+_default_store: Optional[HistoryStore] = None
+_default_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """
+    Process-wide history store shared by all sessions.
+    """
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = HistoryStore(get_data_dir() / "history.sqlite3")
+        return _default_store
@@ -0,0 +1,130 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+# ==================================================
+# TOP-LEVEL DEFINITION SPLITTING
+# ==================================================
+DEFINITION_START = re.compile(r"(?:async\s+def|def|class)\b")
+
+
+def split_segments(code: str) -> List[Tuple[int, str]]:
+    """
+    Split a module into (start line, source) segments at top-level
+    ``def`` / ``class`` / decorator lines, without parsing it.
+
+    Each function or class (with its decorators) starts a new
+    segment; top-level statements stay with the segment before
+    them. A split that falls inside a string or bracket leaves an
+    unclosed construct behind, so callers must parse every segment
+    and fall back to a full parse on SyntaxError.
+    """
+    segments = []
+    current: List[str] = []
+    start = 1
+    in_decorators = False
+
+    for number, line in enumerate(code.splitlines(), 1):
+        is_decorator = line.startswith("@")
+        is_definition = bool(DEFINITION_START.match(line))
+
+        if (is_decorator or is_definition) and not in_decorators:
+            if current:
+                segments.append((start, "\n".join(current)))
+            current, start = [], number
+
+        if is_decorator:
+            in_decorators = True
+        elif is_definition:
+            in_decorators = False
+
+        current.append(line)
+
+    if current:
+        segments.append((start, "\n".join(current)))
+
+    return segments
+
+
+def hash_source(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+# ==================================================
+# CACHE
+# ==================================================
+class IncrementalAnalysisCache:
+    """
+    LRU cache of per-definition analysis results and per-function
+    rule findings.
+
+    Analysis entries are keyed on the hash of a definition's source
+    and store line numbers relative to the definition start, so an
+    unchanged function is reused even when code above it moved.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._segments: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._findings: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, store: OrderedDict, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = store.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, store: OrderedDict, key: Hashable, value: Any):
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > self.max_entries:
+                store.popitem(last=False)
+
+    # ---------------- ANALYSIS SEGMENTS ----------------
+    def get_segment(self, source: str) -> Optional[Dict[str, Any]]:
+        return self._get(self._segments, hash_source(source))
+
+    def put_segment(self, source: str, result: Dict[str, Any]):
+        self._put(self._segments, hash_source(source), result)
+
+    # ---------------- RULE FINDINGS ----------------
+    def findings(
+        self,
+        rule: str,
+        func: Dict[str, Any],
+        params: Tuple,
+        compute: Callable[[], List[Any]]
+    ) -> List[Any]:
+        """
+        Memoize a per-function rule result. The function's line is
+        excluded from the key since it does not affect findings.
+        """
+        key = (
+            rule,
+            params,
+            tuple(sorted((k, v) for k, v in func.items() if k != "line"))
+        )
+        cached = self._get(self._findings, key)
+        if cached is None:
+            cached = compute()
+            self._put(self._findings, key, cached)
+        return list(cached)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "segments": len(self._segments),
+            "findings": len(self._findings)
+        }
@@ -0,0 +1,169 @@
+import atexit
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class _PooledClient:
+    def __init__(self, client: Any, http_client: Any):
+        self.client = client
+        self.http_client = http_client
+        self.last_used = time.monotonic()
+        self.active = 0
+        self.retired = False
+
+
+class GroqClientPool:
+    """
+    Process-wide registry of Groq clients keyed on API key.
+
+    Each client owns a keep-alive httpx connection pool, so repeated
+    calls from Streamlit reruns, sessions and pipeline stages reuse
+    open TLS connections. Clients are only handed out through
+    ``lease``. Clients idle for longer than ``idle_timeout`` seconds
+    are closed; a client with requests in flight is never closed
+    (``close_all`` closes it once its last lease is released).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        idle_timeout: float = 600.0,
+        max_clients: int = 32
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+        self._clients: Dict[str, _PooledClient] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_key: str, base_url: Optional[str]) -> str:
+        # Never keep raw API keys as dict keys
+        raw = f"{api_key}\0{base_url or ''}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _build(self, api_key: str, base_url: Optional[str]) -> _PooledClient:
+        import httpx
+        from groq import Groq
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+        # Retries are handled by src.llm_scheduler, not the SDK
+        client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+            max_retries=0
+        )
+        return _PooledClient(client, http_client)
+
+    # ---------------- ACCESS ----------------
+    @contextmanager
+    def lease(self, api_key: str, base_url: Optional[str] = None) -> Iterator[Any]:
+        """
+        Borrow a client for the duration of a request; it will not
+        be evicted while leased.
+        """
+        with self._lock:
+            pooled = self._acquire(api_key, base_url)
+        try:
+            yield pooled.client
+        finally:
+            with self._lock:
+                pooled.active -= 1
+                pooled.last_used = time.monotonic()
+                if pooled.retired and pooled.active == 0:
+                    self._close(pooled)
+
+    def _acquire(self, api_key: str, base_url: Optional[str]) -> _PooledClient:
+        self._evict_idle()
+        key = self._key(api_key, base_url)
+        pooled = self._clients.get(key)
+
+        if pooled is None:
+            self._evict_lru()
+            pooled = self._build(api_key, base_url)
+            self._clients[key] = pooled
+
+        pooled.last_used = time.monotonic()
+        pooled.active += 1
+        return pooled
+
+    # ---------------- EVICTION ----------------
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key, pooled in list(self._clients.items()):
+            if pooled.active == 0 and now - pooled.last_used > self.idle_timeout:
+                self._close(self._clients.pop(key))
+
+    def _evict_lru(self):
+        idle = sorted(
+            (p.last_used, k) for k, p in self._clients.items() if p.active == 0
+        )
+        while len(self._clients) >= self.max_clients and idle:
+            _, key = idle.pop(0)
+            self._close(self._clients.pop(key))
+
+    @staticmethod
+    def _close(pooled: _PooledClient):
+        try:
+            pooled.http_client.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """
+        Close every pooled client (used on interpreter shutdown and
+        when the pool is replaced). Leased clients are closed when
+        their last lease is released.
+        """
+        with self._lock:
+            for pooled in self._clients.values():
+                if pooled.active:
+                    pooled.retired = True
+                else:
+                    self._close(pooled)
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+_default_pool: Optional[GroqClientPool] = None
+_default_lock = threading.Lock()
+
+
+def get_client_pool() -> GroqClientPool:
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = GroqClientPool()
+            atexit.register(_default_pool.close_all)
+        return _default_pool
+
+
+def configure_client_pool(**settings) -> GroqClientPool:
+    """
+    Replace the process-wide pool (e.g. to change its pool size).
+    The previous pool's clients are closed, leased ones once their
+    requests finish.
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is not None:
+            _default_pool.close_all()
+        _default_pool = GroqClientPool(**settings)
+        atexit.register(_default_pool.close_all)
+        return _default_pool
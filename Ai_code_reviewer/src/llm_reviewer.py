@@ -1,68 +1,297 @@
-from groq import Groq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Tuple
+
+from src.cache import LLMResponseCache, get_default_llm_cache
+from src.llm_client import GroqClientPool, get_client_pool
+from src.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler, get_scheduler
+from src.metrics import PipelineMetrics
+from src.review_chunks import (
+    CHUNKED_REVIEW_TOKENS,
+    estimate_tokens,
+    pack_batches,
+    split_review_chunks
+)
 from src.prompts import (
     SYSTEM_PROMPT,
     build_review_prompt,
+    build_chunk_review_prompt,
+    build_review_reduce_prompt,
     build_code_generation_prompt,
     build_code_generation_with_explanation_prompt
 )
 
+EXPLANATION_MARKER = "EXPLANATION:"
+
 
 class LLMCodeReviewer:
-    def __init__(self, api_key: str):
-        self.client = Groq(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[LLMResponseCache] = None,
+        enable_cache: bool = True,
+        client_pool: Optional[GroqClientPool] = None,
+        base_url: Optional[str] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        chunk_workers: int = 4
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client_pool = client_pool or get_client_pool()
+        self.scheduler = scheduler or get_scheduler(api_key)
+        self.metrics = metrics
+        self.chunk_workers = max(1, chunk_workers)
         self.model_name = "openai/gpt-oss-120b"
+        self.cache = (cache or get_default_llm_cache()) if enable_cache else None
+
+    @property
+    def client(self):
+        """
+        Lease of the shared, connection-pooled Groq client for this
+        API key, held for the duration of a request:
+
+            with self.client as client:
+                client.chat.completions.create(...)
+        """
+        return self.client_pool.lease(self.api_key, self.base_url)
+
+    # --------------------------------------------------
+    # 🔌 LOW-LEVEL CHAT CALLS
+    # --------------------------------------------------
+    def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        use_cache: bool = True,
+        priority: str = INTERACTIVE
+    ) -> str:
+        """
+        Blocking completion. With use_cache=False the cache is not
+        read, but the fresh response still replaces the stored one.
+        Requests go through the rate-limit aware scheduler.
+        """
+        start = time.perf_counter()
+        key = self._cache_key(system_prompt, user_prompt, temperature)
+        if key and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record_call(start, cached=True)
+                return cached
+
+        retries = []
+        with self.client as client:
+            response = self.scheduler.call(
+                lambda: client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=temperature
+                ),
+                priority=priority,
+                tokens=self._estimate_tokens(system_prompt, user_prompt),
+                on_retry=lambda attempt, delay, error: retries.append(attempt)
+            )
+        content = response.choices[0].message.content
+
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "completion_tokens", None):
+            self.scheduler.tokens.consume(usage.completion_tokens)
+        self._record_call(start, usage, retries=len(retries))
+
+        if key and content:
+            self.cache.set(key, content)
+        return content
+
+    def _stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        use_cache: bool = True,
+        priority: str = INTERACTIVE
+    ) -> Iterator[str]:
+        """
+        Yield content deltas as they arrive from the API.
+        A cache hit is yielded as a single chunk.
+        """
+        start = time.perf_counter()
+        key = self._cache_key(system_prompt, user_prompt, temperature)
+        if key and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record_call(start, cached=True, streamed=True)
+                yield cached
+                return
+
+        parts = []
+        retries = []
+        usage = None
+        with self.client as client, \
+                self.scheduler.session(
+                    lambda: client.chat.completions.create(
+                        model=self.model_name,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        temperature=temperature,
+                        stream=True
+                    ),
+                    priority=priority,
+                    tokens=self._estimate_tokens(system_prompt, user_prompt),
+                    on_retry=lambda attempt, delay, error: retries.append(attempt)
+                ) as stream:
+            for chunk in stream:
+                # Groq reports usage on the final chunk under x_groq
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and getattr(x_groq, "usage", None):
+                    usage = x_groq.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        if usage is not None and getattr(usage, "completion_tokens", None):
+            self.scheduler.tokens.consume(usage.completion_tokens)
+        self._record_call(start, usage, retries=len(retries), streamed=True)
+
+        # Only fully received responses are cached
+        if key and parts:
+            self.cache.set(key, "".join(parts))
+
+    def _record_call(
+        self,
+        start: float,
+        usage: Any = None,
+        cached: bool = False,
+        retries: int = 0,
+        streamed: bool = False
+    ):
+        if self.metrics is None:
+            return
+        self.metrics.record_llm_call(
+            time.perf_counter() - start,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            cached=cached,
+            retries=retries,
+            streamed=streamed
+        )
+
+    @staticmethod
+    def _estimate_tokens(system_prompt: str, user_prompt: str) -> int:
+        # Rough prompt size (~4 characters per token) for TPM budgeting
+        return (len(system_prompt) + len(user_prompt)) // 4 + 1
+
+    def _cache_key(self, system_prompt: str, user_prompt: str, temperature: float) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return LLMResponseCache.make_key(
+            self.model_name, system_prompt, user_prompt, temperature
+        )
 
     # --------------------------------------------------
     # 🔍 CODE REVIEW
     # --------------------------------------------------
-    def review_code(self, code: str) -> str:
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": build_review_prompt(code)}
-            ],
-            temperature=0.3
+    def review_code(self, code: str, use_cache: bool = True, chunked: Optional[bool] = None) -> str:
+        """
+        Review in one request, or map-reduce over chunks of the code
+        (``chunked=None`` picks chunks for code above
+        CHUNKED_REVIEW_TOKENS).
+        """
+        if self._use_chunks(code, chunked):
+            findings = self._map_review(code, use_cache)
+            if len(findings) == 1:
+                return findings[0]
+            return self._complete(
+                SYSTEM_PROMPT, build_review_reduce_prompt(findings, self._line_count(code)), 0.2, use_cache
+            )
+        return self._complete(
+            SYSTEM_PROMPT, build_review_prompt(code), 0.3, use_cache
         )
-        return response.choices[0].message.content
+
+    def stream_review_code(
+        self,
+        code: str,
+        use_cache: bool = True,
+        chunked: Optional[bool] = None
+    ) -> Iterator[str]:
+        """
+        Streaming variant of review_code (markdown chunks). In chunked
+        mode only the final merge is streamed.
+        """
+        if self._use_chunks(code, chunked):
+            findings = self._map_review(code, use_cache)
+            if len(findings) == 1:
+                yield findings[0]
+                return
+            yield from self._stream(
+                SYSTEM_PROMPT, build_review_reduce_prompt(findings, self._line_count(code)), 0.2, use_cache
+            )
+            return
+        yield from self._stream(
+            SYSTEM_PROMPT, build_review_prompt(code), 0.3, use_cache
+        )
+
+    # --------------------------------------------------
+    # 🧱 CHUNKED (MAP-REDUCE) REVIEW
+    # --------------------------------------------------
+    @staticmethod
+    def _use_chunks(code: str, chunked: Optional[bool]) -> bool:
+        if chunked is None:
+            return estimate_tokens(code) > CHUNKED_REVIEW_TOKENS
+        return chunked
+
+    @staticmethod
+    def _line_count(code: str) -> int:
+        return len(code.splitlines())
+
+    def _map_review(self, code: str, use_cache: bool) -> List[str]:
+        """
+        Review token-budgeted batches of top-level definitions
+        concurrently; returns their findings in source order. Map
+        prompts hold no line numbers, so batches whose chunks did not
+        change are answered from the LLM cache.
+        """
+        chunks = split_review_chunks(code) or [{"name": "<module>", "line": 1, "source": code}]
+        prompts = [build_chunk_review_prompt(batch) for batch in pack_batches(chunks)]
+
+        def review(prompt: str) -> str:
+            return self._complete(SYSTEM_PROMPT, prompt, 0.3, use_cache)
+
+        with ThreadPoolExecutor(max_workers=min(self.chunk_workers, len(prompts))) as pool:
+            return list(pool.map(review, prompts))
 
     # --------------------------------------------------
     # ✨ CODE GENERATION
     # --------------------------------------------------
-    def generate_code(self, user_request: str) -> str:
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": "You are an expert Python programmer."},
-                {"role": "user", "content": build_code_generation_prompt(user_request)}
-            ],
-            temperature=0.3
+    def generate_code(self, user_request: str, use_cache: bool = True) -> str:
+        return self._complete(
+            "You are an expert Python programmer.",
+            build_code_generation_prompt(user_request),
+            0.3,
+            use_cache
         )
-        return response.choices[0].message.content
 
     # --------------------------------------------------
     # ✨ CODE + EXPLANATION
     # --------------------------------------------------
-    def generate_code_with_explanation(self, user_request: str):
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert Python programmer and teacher."
-                },
-                {
-                    "role": "user",
-                    "content": build_code_generation_with_explanation_prompt(user_request)
-                }
-            ],
-            temperature=0.3
+    def generate_code_with_explanation(self, user_request: str, use_cache: bool = True):
+        content = self._complete(
+            "You are an expert Python programmer and teacher.",
+            build_code_generation_with_explanation_prompt(user_request),
+            0.3,
+            use_cache
         )
 
-        content = response.choices[0].message.content
-
-        if "EXPLANATION:" in content:
-            code_part, explanation_part = content.split("EXPLANATION:", 1)
+        if EXPLANATION_MARKER in content:
+            code_part, explanation_part = content.split(EXPLANATION_MARKER, 1)
             code = code_part.replace("CODE:", "").strip()
             explanation = explanation_part.strip()
         else:
@@ -71,29 +300,82 @@ class LLMCodeReviewer:
 
         return code, explanation
 
+    def stream_code_with_explanation(
+        self,
+        user_request: str,
+        use_cache: bool = True
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Streaming variant of generate_code_with_explanation.
+
+        Yields ("code", chunk) pairs until the EXPLANATION: marker
+        is seen, then ("explanation", chunk) pairs. A marker split
+        across chunks is held back, so no "code" chunk is ever
+        emitted after the first "explanation" chunk.
+        """
+        pending = ""
+        in_explanation = False
+        holdback = len(EXPLANATION_MARKER) - 1
+
+        for chunk in self._stream(
+            "You are an expert Python programmer and teacher.",
+            build_code_generation_with_explanation_prompt(user_request),
+            0.3,
+            use_cache
+        ):
+            if in_explanation:
+                yield "explanation", chunk
+                continue
+
+            pending += chunk
+            index = pending.find(EXPLANATION_MARKER)
+            if index != -1:
+                if index:
+                    yield "code", pending[:index]
+                rest = pending[index + len(EXPLANATION_MARKER):]
+                if rest:
+                    yield "explanation", rest
+                pending = ""
+                in_explanation = True
+                continue
+
+            safe = len(pending) - holdback
+            if safe > 0:
+                yield "code", pending[:safe]
+                pending = pending[safe:]
+
+        if not in_explanation:
+            if pending:
+                yield "code", pending
+            yield "explanation", "Explanation not available."
+
     # --------------------------------------------------
     # 🧩 RAW COMPLETION (FOR MINI PROJECT BUILDER)
     # --------------------------------------------------
-    def raw_completion(self, prompt: str) -> str:
+    def raw_completion(self, prompt: str, use_cache: bool = True) -> str:
         """
         Low-level completion method used by:
         - Project Blueprint Generator
         - Project File Generator
+
+        Scheduled at batch priority, behind interactive requests.
         """
+        return self._complete(
+            "You are a senior Python software architect.",
+            prompt,
+            0.2,
+            use_cache,
+            priority=BATCH
+        ).strip()
 
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a senior Python software architect."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.2
+    def stream_raw_completion(self, prompt: str, use_cache: bool = True) -> Iterator[str]:
+        """
+        Streaming variant of raw_completion (chunks are not stripped).
+        """
+        yield from self._stream(
+            "You are a senior Python software architect.",
+            prompt,
+            0.2,
+            use_cache,
+            priority=BATCH
         )
-
-        return response.choices[0].message.content.strip()
@@ -0,0 +1,289 @@
+import email.utils
+import hashlib
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+# ==================================================
+# ERROR CLASSIFICATION
+# ==================================================
+def status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return status_code(error) == 429
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    429s, transient 5xx responses and connection / timeout errors.
+    """
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds to wait according to Retry-After / retry-after-ms headers.
+    None when there is no usable hint (the caller's backoff applies).
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            seconds = float(value) / 1000
+            if math.isfinite(seconds):
+                return max(seconds, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            # Malformed date: keep the original error, not a parsing one
+            return None
+    return max(seconds, 0.0) if math.isfinite(seconds) else None
+
+
+# ==================================================
+# TOKEN BUCKET
+# ==================================================
+class TokenBucket:
+    """
+    Refills ``rate_per_minute`` units per minute up to ``capacity``.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0):
+        """
+        Block until ``amount`` units are available, then take them.
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def consume(self, amount: float):
+        """
+        Debit units without blocking (may go negative), e.g. for
+        completion tokens known only after the response.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+
+# ==================================================
+# SCHEDULER
+# ==================================================
+class LLMScheduler:
+    """
+    Admission control for LLM requests.
+
+    - Requests-per-minute and tokens-per-minute token buckets
+    - AIMD concurrency limit: +1/limit per success, halved on 429
+    - Priority queue: interactive requests always go before batch
+    - Exponential backoff with full jitter, honouring Retry-After
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float = 60000,
+        initial_concurrency: float = 4,
+        min_concurrency: float = 1,
+        max_concurrency: float = 16,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.in_flight = 0
+        self.retries = 0
+        self.throttled = 0
+        self._waiting: list = []
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    # ---------------- CONCURRENCY SLOTS ----------------
+    def _acquire_slot(self, priority: str):
+        ticket = (PRIORITIES.get(priority, 1), next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            while self._waiting[0] != ticket or self.in_flight >= int(self.limit):
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            self._condition.notify_all()
+
+    def _release_slot(self, throttled: bool):
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                # One multiplicative decrease per second of 429s
+                if now - self._last_decrease > 1.0:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    # ---------------- BACKOFF ----------------
+    def backoff(self, attempt: int, error: Exception) -> float:
+        hinted = retry_after(error)
+        if hinted is not None:
+            return min(hinted, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # ---------------- ENTRY POINTS ----------------
+    @contextmanager
+    def session(
+        self,
+        request: Callable[[], Any],
+        priority: str = INTERACTIVE,
+        tokens: float = 0,
+        on_retry: Optional[Callable[[int, float, Exception], None]] = None
+    ) -> Iterator[Any]:
+        """
+        Run ``request`` under admission control, retrying retryable
+        errors, and hold its concurrency slot until the block exits
+        (so a streamed response keeps its slot while it is read).
+        """
+        attempt = 0
+        while True:
+            self._acquire_slot(priority)
+            self.requests.acquire(1)
+            if tokens:
+                self.tokens.acquire(tokens)
+            try:
+                result = request()
+            except Exception as e:
+                self._release_slot(throttled=is_rate_limited(e))
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt, e)
+                attempt += 1
+                self.retries += 1
+                if on_retry:
+                    on_retry(attempt, delay, e)
+                time.sleep(delay)
+                continue
+            break
+
+        failed = False
+        try:
+            yield result
+        except Exception as e:
+            failed = True
+            self._release_slot(throttled=is_rate_limited(e))
+            raise
+        finally:
+            if not failed:
+                self._release_slot(throttled=False)
+
+    def call(
+        self,
+        request: Callable[[], Any],
+        priority: str = INTERACTIVE,
+        tokens: float = 0,
+        on_retry: Optional[Callable[[int, float, Exception], None]] = None
+    ) -> Any:
+        with self.session(request, priority, tokens, on_retry) as result:
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+                "retries": self.retries,
+                "throttled": self.throttled
+            }
+
+
+# ==================================================
+# PER-KEY REGISTRY
+# ==================================================
+_schedulers: Dict[str, LLMScheduler] = {}
+_scheduler_settings: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+
+
+def get_scheduler(api_key: str) -> LLMScheduler:
+    """
+    Rate limits apply per API key, so all reviewers sharing a key
+    share one scheduler.
+    """
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _registry_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = LLMScheduler(**_scheduler_settings)
+            _schedulers[key] = scheduler
+        return scheduler
+
+
+def configure_scheduler(**settings):
+    """
+    Set limits for schedulers created from now on.
+    """
+    with _registry_lock:
+        _scheduler_settings.clear()
+        _scheduler_settings.update(settings)
+        _schedulers.clear()
@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.utils import get_data_dir
+
+
+def default_metrics_path() -> Path:
+    return get_data_dir() / "metrics.jsonl"
+
+
+class PipelineMetrics:
+    """
+    Collects wall time per stage and per generated file, plus token
+    usage, cache hits and retries of every LLM call in one run.
+
+    Thread-safe: files are generated concurrently.
+    """
+
+    def __init__(self, pipeline: str = "mini_project_build"):
+        self.pipeline = pipeline
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages: Dict[str, float] = {}
+        self.files: Dict[str, float] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+
+    # ---------------- TIMERS ----------------
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        with self._lock:
+            if self._first_start is None:
+                self._first_start = start
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + end - start
+                if self._last_end is None or end > self._last_end:
+                    self._last_end = end
+
+    @contextmanager
+    def file(self, filename: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.files[filename] = time.perf_counter() - start
+
+    def mark(self, name: str):
+        """
+        Record when something first happened (e.g. "first_file"),
+        relative to the start of the first stage.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if name not in self.marks:
+                self.marks[name] = now - (self._first_start or now)
+
+    # ---------------- LLM CALLS ----------------
+    def record_llm_call(
+        self,
+        seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached: bool = False,
+        retries: int = 0,
+        streamed: bool = False
+    ):
+        with self._lock:
+            self.llm_calls.append({
+                "seconds": round(seconds, 4),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cached": cached,
+                "retries": retries,
+                "streamed": streamed
+            })
+
+    # ---------------- REPORTING ----------------
+    def _wall_seconds(self) -> float:
+        """
+        First stage start to last stage end: stages may overlap
+        (planning and generation start while the blueprint streams).
+        """
+        if self._first_start is None or self._last_end is None:
+            return 0.0
+        return self._last_end - self._first_start
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.llm_calls)
+            return {
+                "run_id": self.run_id,
+                "pipeline": self.pipeline,
+                "started_at": self.started_at,
+                "total_seconds": round(self._wall_seconds(), 4),
+                "stages": {k: round(v, 4) for k, v in self.stages.items()},
+                "files": {k: round(v, 4) for k, v in self.files.items()},
+                "marks": {k: round(v, 4) for k, v in self.marks.items()},
+                "llm_calls": len(calls),
+                "cache_hits": sum(1 for c in calls if c["cached"]),
+                "retries": sum(c["retries"] for c in calls),
+                "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+                "completion_tokens": sum(c["completion_tokens"] for c in calls)
+            }
+
+    def write(self, path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """
+        Append this run's summary as one JSON line.
+        """
+        record = self.summary()
+        with open(path or default_metrics_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return record
+
+
+# ==================================================
+# HISTORICAL PERCENTILES
+# ==================================================
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def stage_percentiles(
+    path: Optional[Union[str, Path]] = None,
+    pipeline: str = "mini_project_build",
+    last: int = 500
+) -> Dict[str, Dict[str, float]]:
+    """
+    p50 / p95 wall time per stage (and in total) over the last
+    ``last`` recorded runs of a pipeline.
+    """
+    path = Path(path or default_metrics_path())
+    if not path.exists():
+        return {}
+
+    samples: Dict[str, List[float]] = {}
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()[-last:]
+
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("pipeline") != pipeline:
+            continue
+        for stage, seconds in record.get("stages", {}).items():
+            samples.setdefault(stage, []).append(seconds)
+        samples.setdefault("total", []).append(record.get("total_seconds", 0.0))
+
+    return {
+        stage: {
+            "runs": len(values),
+            "p50": round(_percentile(values, 0.5), 3),
+            "p95": round(_percentile(values, 0.95), 3)
+        }
+        for stage, values in samples.items()
+    }
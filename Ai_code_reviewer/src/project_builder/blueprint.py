@@ -1,17 +1,72 @@
-from typing import Dict
-import json
+from typing import Any, Callable, Dict, Iterable, Optional
+import re
+import time
 
+from src.cache import BlueprintCache, get_blueprint_cache
 from src.llm_reviewer import LLMCodeReviewer
+from src.project_builder.json_stream import IncrementalJSONObject, repair_json
+
+PROJECT_TYPES = {"script", "web", "gui", "library"}
+INTERACTION_MODES = {"cli", "gui"}
+
+
+# --------------------------------------------------
+# 📐 BLUEPRINT SCHEMA
+# --------------------------------------------------
+FIELD_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "project_name": lambda v: isinstance(v, str) and re.fullmatch(r"[a-z][a-z0-9_]*", v) is not None,
+    "project_type": lambda v: isinstance(v, str) and v in PROJECT_TYPES,
+    "interaction_mode": lambda v: isinstance(v, str) and v in INTERACTION_MODES,
+    "features": lambda v: isinstance(v, list) and bool(v) and all(isinstance(f, str) for f in v),
+    "entry_point": lambda v: isinstance(v, str) and v.endswith(".py"),
+    "description": lambda v: isinstance(v, str)
+}
+
+# Enough for ProjectPlanner and the LLM-generated files to start
+PLANNING_FIELDS = ("project_name", "interaction_mode", "features")
+
+
+def validate_blueprint(
+    blueprint: Any,
+    interaction_mode: Optional[str] = None,
+    fields: Iterable[str] = FIELD_CHECKS
+) -> bool:
+    """
+    True when a blueprint has every field of the JSON template with
+    the right type and values (and the expected interaction mode).
+    Pass ``fields`` to check a partial blueprint.
+    """
+    if not isinstance(blueprint, dict):
+        return False
+    if not all(field in blueprint and FIELD_CHECKS[field](blueprint[field]) for field in fields):
+        return False
+    return interaction_mode is None or blueprint.get("interaction_mode", interaction_mode) == interaction_mode
 
 
 class ProjectBlueprintGenerator:
     """
     Converts a natural language project description into
     a structured Python project blueprint.
+
+    The response is streamed through an incremental JSON extractor,
+    so callers can start planning once the planning fields are in.
+    Blueprints are cached on the normalized prompt and interaction
+    mode; ``last_cache_hit`` / ``last_saved_seconds`` /
+    ``last_repaired`` describe the most recent call.
     """
 
-    def __init__(self, api_key: str):
-        self.llm = LLMCodeReviewer(api_key)
+    def __init__(
+        self,
+        api_key: str,
+        llm: Optional[LLMCodeReviewer] = None,
+        cache: Optional[BlueprintCache] = None,
+        enable_cache: bool = True
+    ):
+        self.llm = llm or LLMCodeReviewer(api_key)
+        self.cache = (cache or get_blueprint_cache()) if enable_cache else None
+        self.last_cache_hit = False
+        self.last_saved_seconds = 0.0
+        self.last_repaired = False
 
     # --------------------------------------------------
     # 🔎 INTERACTION MODE DETECTION
@@ -38,8 +93,31 @@ class ProjectBlueprintGenerator:
     # --------------------------------------------------
     # 🧩 BLUEPRINT GENERATION
     # --------------------------------------------------
-    def generate_blueprint(self, user_prompt: str) -> Dict:
+    def generate_blueprint(
+        self,
+        user_prompt: str,
+        use_cache: bool = True,
+        on_partial: Optional[Callable[[Dict], None]] = None,
+        on_update: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        ``on_partial(fields)`` is called at most once, while the
+        response is still streaming, as soon as the PLANNING_FIELDS
+        are parsed and valid. After that ``on_update(fields)`` is
+        called whenever more members have been parsed (e.g. the
+        description). Neither is called on a cache hit.
+        """
         interaction_mode = self._detect_interaction_mode(user_prompt)
+        self.last_cache_hit = False
+        self.last_saved_seconds = 0.0
+        self.last_repaired = False
+
+        if self.cache is not None and use_cache:
+            cached, saved = self.cache.get_blueprint(user_prompt, interaction_mode)
+            if cached is not None:
+                self.last_cache_hit = True
+                self.last_saved_seconds = saved
+                return cached
 
         prompt = f"""
 You are a senior Python software architect.
@@ -60,30 +138,85 @@ Return output STRICTLY in valid JSON format:
   "project_name": "<short_snake_case_name>",
   "project_type": "<script | web | gui | library>",
   "interaction_mode": "{interaction_mode}",
-  "description": "<1-2 line summary>",
   "features": [
     "<feature 1>",
     "<feature 2>",
     "<feature 3>"
   ],
-  "entry_point": "<main python file name>"
+  "entry_point": "<main python file name>",
+  "description": "<1-2 line summary>"
 }}
 
 Project Request:
 \"\"\"{user_prompt}\"\"\"
 """
 
-        response_text = self.llm.raw_completion(prompt)
-        return self._parse_response(response_text)
-
-    # --------------------------------------------------
-    # 🛡️ SAFE JSON PARSING
-    # --------------------------------------------------
-    def _parse_response(self, text: str) -> Dict:
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+        start = time.perf_counter()
+        response_text = self._stream_response(
+            prompt, use_cache, interaction_mode, on_partial, on_update
+        )
+        blueprint = self._parse_response(response_text)
+        if blueprint is None:
+            # Local repair failed: ask once more, bypassing the response cache
+            response_text = self.llm.raw_completion(prompt, use_cache=False)
+            blueprint = self._parse_response(response_text)
+        if blueprint is None:
             raise ValueError(
                 "Failed to generate a valid project blueprint. "
                 "Please rephrase your project description."
             )
+
+        # Only blueprints matching the schema are reused later
+        if self.cache is not None and validate_blueprint(blueprint, interaction_mode):
+            self.cache.set_blueprint(
+                user_prompt, interaction_mode, blueprint, time.perf_counter() - start
+            )
+        return blueprint
+
+    # --------------------------------------------------
+    # 📡 STREAMED RESPONSE
+    # --------------------------------------------------
+    def _stream_response(
+        self,
+        prompt: str,
+        use_cache: bool,
+        interaction_mode: str,
+        on_partial: Optional[Callable[[Dict], None]],
+        on_update: Optional[Callable[[Dict], None]] = None
+    ) -> str:
+        extractor = IncrementalJSONObject()
+        notified = on_partial is None
+        seen = 0
+
+        for chunk in self.llm.stream_raw_completion(prompt, use_cache=use_cache):
+            fields = extractor.feed(chunk)
+            if not notified:
+                if validate_blueprint(fields, interaction_mode, PLANNING_FIELDS):
+                    notified = True
+                    seen = len(fields)
+                    on_partial(dict(fields))
+            elif on_update is not None and len(fields) > seen:
+                seen = len(fields)
+                on_update(dict(fields))
+
+        return extractor.text
+
+    # --------------------------------------------------
+    # 🛡️ SAFE JSON PARSING
+    # --------------------------------------------------
+    def _parse_response(self, text: str) -> Optional[Dict]:
+        """
+        Extract the JSON object, tolerating code fences and prose
+        around it; truncated or slightly malformed JSON is repaired
+        locally. Returns None when nothing usable is found.
+        """
+        extractor = IncrementalJSONObject()
+        extractor.feed(text)
+        blueprint = extractor.result()
+        if blueprint is None:
+            blueprint = repair_json(text)
+            # A repair that lost the planning fields is no better than a retry
+            if not validate_blueprint(blueprint, fields=PLANNING_FIELDS):
+                return None
+            self.last_repaired = True
+        return blueprint
@@ -1,6 +1,14 @@
 import re
 from typing import Dict
 
+# Lines starting with these (case-insensitive) are LLM prose, not code
+EXPLANATORY_PREFIXES = (
+    "here is",
+    "this code",
+    "below is",
+    "the following"
+)
+
 
 class ProjectFormatter:
     """
@@ -14,13 +22,24 @@ class ProjectFormatter:
         formatted = {}
 
         for filename, content in files.items():
-            if filename.lower().endswith(".md"):
-                formatted[filename] = self._format_markdown(content)
-            else:
-                formatted[filename] = self._format_python(content)
+            formatted[filename] = self.format_file(filename, content)
 
         return formatted
 
+    def format_file(self, filename: str, content: str) -> str:
+        """
+        Format a single file (as soon as it is generated).
+        """
+        if filename.lower().endswith(".md"):
+            return self._format_markdown(content)
+        return self._format_python(content)
+
+    def stream(self, filename: str) -> "StreamingFormatter":
+        """
+        Incremental formatter for a file that is still streaming.
+        """
+        return StreamingFormatter(python=not filename.lower().endswith(".md"))
+
     # --------------------------------------------------
     # INTERNAL HELPERS
     # --------------------------------------------------
@@ -59,12 +78,7 @@ class ProjectFormatter:
         cleaned = []
 
         for line in lines:
-            if line.lower().startswith((
-                "here is",
-                "this code",
-                "below is",
-                "the following"
-            )):
+            if line.lower().startswith(EXPLANATORY_PREFIXES):
                 continue
             cleaned.append(line)
 
@@ -76,3 +90,120 @@ class ProjectFormatter:
         """
         text = re.sub(r"\n{3,}", "\n\n", text)
         return text
+
+
+# Line boundaries of str.splitlines (``\r\n`` counts as one)
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_BACKTICK_RUN = re.compile("`+")
+_BLANK_RUN = re.compile(r"\n{3,}")
+
+
+class StreamingFormatter:
+    """
+    Incremental version of ProjectFormatter's cleanup that can sit
+    directly on a streamed LLM response:
+
+        formatter = ProjectFormatter().stream("core.py")
+        for chunk in llm.stream_raw_completion(prompt):
+            show(formatter.feed(chunk))
+        show(formatter.finish())
+
+    Each chunk is handled once by a chain of small states, each the
+    streaming equivalent of one pass of the batch formatter:
+
+    - fences: a line holding ``` is cut from there to its end,
+      newline included (``re.sub(r"```.*?\\n", "")``)
+    - backticks: a run of n backticks keeps n % 3 of them
+      (``replace("```", "")``)
+    - prose (Python only): lines are split like str.splitlines and
+      lines starting with an explanatory phrase are dropped
+    - whitespace: runs of 3+ newlines collapse to 2 (Python only)
+      and the text is stripped, with a single trailing newline
+
+    Only the current line and trailing whitespace are held back.
+    Output is identical to ProjectFormatter.format_file on the
+    concatenated chunks.
+    """
+
+    def __init__(self, python: bool = True):
+        self.python = python
+        self._fence_line = ""         # current line, up to its "\n"
+        self._backticks = 0           # trailing run of backticks
+        self._prose_line = ""         # current line, up to any line break
+        self._first_line = True
+        self._whitespace = ""         # trailing whitespace, held back
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk; returns the formatted text that is final.
+        """
+        return self._fences(chunk, final=False)
+
+    def finish(self) -> str:
+        """
+        Flush the held-back state; returns the rest of the output.
+        """
+        return self._fences("", final=True)
+
+    # ---------------- STAGES ----------------
+    def _fences(self, chunk: str, final: bool) -> str:
+        parts = (self._fence_line + chunk).split("\n")
+        self._fence_line = parts.pop()
+        out = []
+        for line in parts:
+            index = line.find("```")
+            out.append(line[:index] if index != -1 else line + "\n")
+        if final:
+            # A fence without a newline after it is left to the
+            # backtick stage, like the regex leaves it to replace()
+            out.append(self._fence_line)
+            self._fence_line = ""
+        return self._backtick_runs("".join(out), final)
+
+    def _backtick_runs(self, text: str, final: bool) -> str:
+        if self._backticks:
+            text = "`" * self._backticks + text
+            self._backticks = 0
+        if not final:
+            # The trailing run may continue in the next chunk
+            kept = text.rstrip("`")
+            self._backticks = len(text) - len(kept)
+            text = kept
+        text = _BACKTICK_RUN.sub(lambda m: "`" * (len(m.group()) % 3), text)
+        return self._prose(text, final) if self.python else self._strip(text, final)
+
+    def _prose(self, text: str, final: bool) -> str:
+        lines = (self._prose_line + text).splitlines(keepends=True)
+        self._prose_line = ""
+        if not final and lines and (lines[-1][-1] not in _LINE_BREAKS or lines[-1][-1] == "\r"):
+            # Incomplete, or a "\r" that may be the start of "\r\n"
+            self._prose_line = lines.pop()
+
+        kept = []
+        for line in lines:
+            if line[-1] in _LINE_BREAKS:
+                line = line[:-2] if line.endswith("\r\n") else line[:-1]
+            if not line.lower().startswith(EXPLANATORY_PREFIXES):
+                kept.append(line)
+        if not kept:
+            return self._strip("", final)
+
+        # Lines are joined with "\n", like "\n".join(splitlines())
+        out = "\n".join(kept)
+        if not self._first_line:
+            out = "\n" + out
+        self._first_line = False
+        return self._strip(out, final)
+
+    def _strip(self, text: str, final: bool) -> str:
+        text = self._whitespace + text
+        kept = text.rstrip()
+        # Trailing whitespace is only kept if more text follows it
+        self._whitespace = "" if final else text[len(kept):]
+        if kept and not self._started:
+            self._started = True
+            kept = kept.lstrip()
+        if self.python:
+            kept = _BLANK_RUN.sub("\n\n", kept)
+        return kept + "\n" if final else kept
@@ -1,5 +1,12 @@
-from typing import Dict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from threading import Event
+from typing import Callable, Dict, List, Optional
+
+from src.analyzer import CodeAnalyzer
 from src.llm_reviewer import LLMCodeReviewer
+from src.metrics import PipelineMetrics
+from src.project_builder.formatter import ProjectFormatter
 
 
 class ProjectCodeGenerator:
@@ -8,10 +15,31 @@ class ProjectCodeGenerator:
     - Project blueprint
     - Planned file responsibilities
     - Interaction mode (CLI / GUI)
+
+    LLM-backed files are generated concurrently, at most
+    ``max_workers`` at a time, in dependency order when a DAG is
+    given. Use ``max_workers=1`` for the sequential behaviour.
+
+    Responses are streamed through ProjectFormatter as they arrive,
+    so every file comes out already formatted.
     """
 
-    def __init__(self, api_key: str):
-        self.llm = LLMCodeReviewer(api_key)
+    LOCAL_FILES = ("readme.md", "requirements.txt")
+
+    def __init__(
+        self,
+        api_key: str,
+        max_workers: int = 4,
+        llm: Optional[LLMCodeReviewer] = None,
+        metrics: Optional[PipelineMetrics] = None
+    ):
+        self.llm = llm or LLMCodeReviewer(api_key)
+        self.max_workers = max(1, max_workers)
+        self.metrics = metrics
+        self.formatter = ProjectFormatter()
+        self.failures: Dict[str, str] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+        self.digests: Dict[str, str] = {}
 
     # ==================================================
     # MAIN GENERATION METHOD
@@ -19,34 +47,249 @@ class ProjectCodeGenerator:
     def generate_project_code(
         self,
         blueprint: Dict,
-        file_plan: Dict[str, str]
+        file_plan: Dict[str, str],
+        on_file: Optional[Callable[[str, str], None]] = None,
+        blueprint_ready: Optional[Event] = None,
+        on_failure: Optional[Callable[[str, str], None]] = None,
+        dependencies: Optional[Dict[str, List[str]]] = None,
+        cancel: Optional[Event] = None
     ) -> Dict[str, str]:
+        """
+        Generate every planned file.
+
+        README.md and requirements.txt are built locally right away;
+        the remaining files are generated by the LLM in parallel.
+
+        With ``dependencies`` (file -> files it uses, see
+        ProjectPlanner.create_dependencies) a file is generated only
+        once its dependencies are done, and its prompt carries their
+        signature digest (extracted locally by CodeAnalyzer) rather
+        than their source. Independent files still run in parallel;
+        a failed dependency is left out of the digest.
+
+        Files that fail are left out of the result and reported in
+        ``self.failures`` (filename -> error message).
+
+        ``on_file(filename, content)`` / ``on_failure(filename, error)``
+        are called on the calling thread as soon as each file is done,
+        in completion order (see BuildPipeline for in-order output).
+        Files handed to ``on_file`` are not kept, so the result is
+        empty in that case.
+
+        To start from a partial blueprint while the rest is still
+        streaming, pass ``blueprint_ready`` and set it once
+        ``blueprint`` has been completed in place: LLM files start
+        right away, each from a snapshot of it taken when the file is
+        submitted (so files started after the description arrived
+        include it); local files wait for the event.
+
+        Setting ``cancel`` stops new LLM requests from being submitted;
+        files already in flight are finished and reported as usual.
+
+        Returns:
+            Dict of filename -> content, in ``file_plan`` order.
+        """
+        self.failures = {}
+        results: Dict[str, str] = {}
+        llm_files = {}
+        local_files = {}
+        for filename, responsibility in file_plan.items():
+            if filename.lower() in self.LOCAL_FILES:
+                local_files[filename] = responsibility
+            else:
+                llm_files[filename] = responsibility
+
+        dependencies = self.dependencies = dependencies or {}
+        # Only LLM files of this call can be waited for
+        waiting = {
+            filename: {d for d in dependencies.get(filename, []) if d in llm_files and d != filename}
+            for filename in llm_files
+        }
+        needed = {d for deps in waiting.values() for d in deps}
+        digests = self.digests = {}
+
+        workers = min(self.max_workers, max(1, len(llm_files)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+
+            def submit_ready():
+                for filename in [f for f, deps in waiting.items() if not deps]:
+                    if cancel is not None and cancel.is_set():
+                        waiting.clear()
+                        return
+                    del waiting[filename]
+                    upstream = {
+                        dep: digests[dep]
+                        for dep in dependencies.get(filename, [])
+                        if digests.get(dep)
+                    }
+                    future = pool.submit(
+                        self._timed_generate, dict(blueprint), filename, llm_files[filename], upstream
+                    )
+                    futures[future] = filename
+                # A dependency cycle would stall: release what is left
+                if waiting and not futures:
+                    for deps in waiting.values():
+                        deps.clear()
+                    submit_ready()
+
+            submit_ready()
+
+            while futures or local_files:
+                if cancel is not None and cancel.is_set():
+                    local_files = {}
+                if local_files and (blueprint_ready is None or blueprint_ready.is_set()):
+                    for filename, responsibility in local_files.items():
+                        content = self._timed_generate(blueprint, filename, responsibility)
+                        self._emit(results, filename, self.formatter.format_file(filename, content), on_file)
+                    local_files = {}
+                    continue
+                if not futures:
+                    blueprint_ready.wait()
+                    continue
+
+                # Keep an eye on the blueprint while local files wait for it
+                done, _ = wait(
+                    futures,
+                    timeout=0.05 if local_files else None,
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    filename = futures.pop(future)
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        self.failures[filename] = str(e)
+                        if on_failure:
+                            on_failure(filename, str(e))
+                    else:
+                        if filename in needed:
+                            digests[filename] = self._signature_digest(content)
+                        self._emit(results, filename, content, on_file)
+                    for deps in waiting.values():
+                        deps.discard(filename)
+                submit_ready()
+
+        # Keep output deterministic regardless of completion order
+        return {
+            filename: results[filename]
+            for filename in file_plan
+            if filename in results
+        }
 
-        interaction_mode = blueprint.get("interaction_mode", "gui")
-        generated_files: Dict[str, str] = {}
+    # ==================================================
+    # SELECTIVE REGENERATION
+    # ==================================================
+    def regenerate_file(
+        self,
+        blueprint: Dict,
+        filename: str,
+        responsibility: str,
+        content: str,
+        problem: str
+    ) -> str:
+        """
+        Ask for a fixed version of one file that failed validation,
+        feeding the problem and the broken file back. Dependency
+        signatures from the last generate_project_code call are
+        included again. Returns the formatted file.
+        """
+        upstream = {
+            dep: self.digests[dep]
+            for dep in self.dependencies.get(filename, [])
+            if self.digests.get(dep)
+        }
+        prompt = f"""
+The following Python project file failed validation. Fix it.
 
-        for filename, responsibility in file_plan.items():
+File name: {filename}
+Responsibility: {responsibility}
+Problem: {problem}
 
-            if filename.lower() == "readme.md":
-                content = self._generate_readme(blueprint)
+Features:
+{", ".join(blueprint.get("features", []))}
+{self._upstream(upstream)}
+Current file:
+{content}
 
-            elif filename.lower() == "requirements.txt":
-                content = self._generate_requirements(blueprint)
+Rules:
+- Return the complete corrected file
+- Change only what is needed to fix the problem
+- Python only
+- Do NOT include markdown
+"""
 
-            elif filename in ("main.py", "app.py"):
-                if interaction_mode == "cli":
-                    content = self._generate_cli_entry(blueprint)
-                else:
-                    content = self._generate_gui_entry(blueprint)
+        timer = self.metrics.file(f"{filename} (regenerated)") if self.metrics else nullcontext()
+        with timer:
+            fixed = self._complete(filename, prompt)
+        if filename in self.digests:
+            self.digests[filename] = self._signature_digest(fixed)
+        return fixed
 
-            else:
-                content = self._generate_generic_file(
-                    blueprint, filename, responsibility
-                )
+    def _complete(self, filename: str, prompt: str) -> str:
+        """
+        Stream a file from the LLM, formatting each chunk as it arrives.
+        """
+        stream = self.formatter.stream(filename)
+        parts = [stream.feed(chunk) for chunk in self.llm.stream_raw_completion(prompt)]
+        parts.append(stream.finish())
+        return "".join(parts)
+
+    @staticmethod
+    def _signature_digest(content: str) -> str:
+        """
+        Signatures of a generated (formatted) file, as its dependents
+        get to see it.
+        """
+        return CodeAnalyzer(content).signature_digest()
+
+    @staticmethod
+    def _emit(
+        results: Dict[str, str],
+        filename: str,
+        content: str,
+        on_file: Optional[Callable[[str, str], None]]
+    ):
+        if on_file:
+            on_file(filename, content)
+        else:
+            results[filename] = content
 
-            generated_files[filename] = content.strip() + "\n"
+    # ==================================================
+    # SINGLE FILE DISPATCH
+    # ==================================================
+    def _timed_generate(
+        self,
+        blueprint: Dict,
+        filename: str,
+        responsibility: str,
+        upstream: Optional[Dict[str, str]] = None
+    ) -> str:
+        timer = self.metrics.file(filename) if self.metrics else nullcontext()
+        with timer:
+            return self._generate_file(blueprint, filename, responsibility, upstream)
 
-        return generated_files
+    def _generate_file(
+        self,
+        blueprint: Dict,
+        filename: str,
+        responsibility: str,
+        upstream: Optional[Dict[str, str]] = None
+    ) -> str:
+        interaction_mode = blueprint.get("interaction_mode", "gui")
+
+        if filename.lower() == "readme.md":
+            return self._generate_readme(blueprint)
+
+        if filename.lower() == "requirements.txt":
+            return self._generate_requirements(blueprint)
+
+        if filename in ("main.py", "app.py"):
+            if interaction_mode == "cli":
+                return self._generate_cli_entry(blueprint, filename, upstream)
+            return self._generate_gui_entry(blueprint, filename, upstream)
+
+        return self._generate_generic_file(blueprint, filename, responsibility, upstream)
 
     # ==================================================
     # README GENERATION
@@ -108,16 +351,18 @@ class ProjectCodeGenerator:
     # ==================================================
     # CLI ENTRY FILE
     # ==================================================
-    def _generate_cli_entry(self, blueprint: Dict) -> str:
+    def _generate_cli_entry(
+        self,
+        blueprint: Dict,
+        filename: str,
+        upstream: Optional[Dict[str, str]] = None
+    ) -> str:
         prompt = f"""
 Generate a Python CLI application entry file.
-
-Project description:
-{blueprint.get("description")}
-
+{self._description(blueprint)}
 Features:
 {", ".join(blueprint.get("features", []))}
-
+{self._upstream(upstream)}
 Requirements:
 - Use argparse
 - Provide subcommands for features
@@ -126,21 +371,23 @@ Requirements:
 - Do NOT include markdown
 """
 
-        return self.llm.raw_completion(prompt)
+        return self._complete(filename, prompt)
 
     # ==================================================
     # GUI ENTRY FILE (STREAMLIT)
     # ==================================================
-    def _generate_gui_entry(self, blueprint: Dict) -> str:
+    def _generate_gui_entry(
+        self,
+        blueprint: Dict,
+        filename: str,
+        upstream: Optional[Dict[str, str]] = None
+    ) -> str:
         prompt = f"""
 Generate a Streamlit-based Python GUI application.
-
-Project description:
-{blueprint.get("description")}
-
+{self._description(blueprint)}
 Features:
 {", ".join(blueprint.get("features", []))}
-
+{self._upstream(upstream)}
 Requirements:
 - Use streamlit
 - Simple and clean UI
@@ -149,7 +396,28 @@ Requirements:
 - Do NOT include markdown
 """
 
-        return self.llm.raw_completion(prompt)
+        return self._complete(filename, prompt)
+
+    @staticmethod
+    def _description(blueprint: Dict) -> str:
+        """
+        Prompt section for the project description, left out while
+        the blueprint is still streaming.
+        """
+        description = blueprint.get("description")
+        if description is None:
+            return ""
+        return f"\nProject description:\n{description}\n"
+
+    @staticmethod
+    def _upstream(upstream: Optional[Dict[str, str]]) -> str:
+        """
+        Prompt section with the signatures of the files this one uses.
+        """
+        if not upstream:
+            return ""
+        apis = "\n\n".join(f"# {name}\n{digest}" for name, digest in upstream.items())
+        return f"\nAPIs of files already generated (import and use them exactly as declared):\n{apis}\n"
 
     # ==================================================
     # GENERIC FILE GENERATOR
@@ -158,20 +426,18 @@ Requirements:
         self,
         blueprint: Dict,
         filename: str,
-        responsibility: str
+        responsibility: str,
+        upstream: Optional[Dict[str, str]] = None
     ) -> str:
         prompt = f"""
 Generate Python code for the following file.
 
 File name: {filename}
 Responsibility: {responsibility}
-
-Project description:
-{blueprint.get("description")}
-
+{self._description(blueprint)}
 Features:
 {", ".join(blueprint.get("features", []))}
-
+{self._upstream(upstream)}
 Rules:
 - Python only
 - Modular and clean
@@ -179,4 +445,4 @@ Rules:
 - Do NOT include markdown
 """
 
-        return self.llm.raw_completion(prompt)
+        return self._complete(filename, prompt)
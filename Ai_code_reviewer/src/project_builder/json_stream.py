@@ -0,0 +1,192 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalJSONObject:
+    """
+    Incrementally extracts one top-level JSON object from streamed
+    LLM output.
+
+    Leading prose and code fences are skipped (parsing starts at the
+    first ``{``) and anything after the closing brace is ignored.
+    Each top-level member is decoded as soon as its value is complete,
+    so callers can act on early fields while later ones are streaming.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"
+        self._key: Optional[str] = None
+        self._token_start = 0
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """
+        Consume a chunk; returns the members decoded so far.
+        """
+        self.text += chunk
+        if self.complete:
+            return self.fields
+
+        if self._start == -1:
+            self._start = self.text.find("{", self._pos)
+            if self._start == -1:
+                self._pos = len(self.text)
+                return self.fields
+            self._pos = self._start
+
+        text = self.text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key_end":
+                        self._key = json.loads(text[self._token_start:index + 1])
+                        self._expect = "colon"
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._token_start = index
+                    self._expect = "key_end"
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_member(index)
+                    self.complete = True
+                    self._pos = index + 1
+                    return self.fields
+            elif self._depth == 1:
+                if char == ":" and self._expect == "colon":
+                    self._token_start = index + 1
+                    self._expect = "value"
+                elif char == "," and self._expect == "value":
+                    self._finish_member(index)
+
+        self._pos = len(text)
+        return self.fields
+
+    def _finish_member(self, end: int):
+        if self._expect != "value" or self._key is None:
+            return
+        raw = self.text[self._token_start:end].strip()
+        try:
+            self.fields[self._key] = json.loads(raw)
+        except json.JSONDecodeError:
+            pass
+        self._key = None
+        self._expect = "key"
+
+    def has(self, *keys: str) -> bool:
+        return all(key in self.fields for key in keys)
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """
+        The whole object once its closing brace has been seen.
+        """
+        if not self.complete:
+            return None
+        try:
+            value = json.loads(self.text[self._start:self._pos])
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
+
+
+# --------------------------------------------------
+# 🩹 LOCAL REPAIR
+# --------------------------------------------------
+def _scan(text: str):
+    """
+    Open brackets (innermost last), whether the text ends inside a
+    string, and the positions of commas outside strings.
+    """
+    stack: List[str] = []
+    commas: List[int] = []
+    in_string = escape = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+        elif char == ",":
+            commas.append(index)
+
+    return stack, in_string, commas
+
+
+def _close(text: str) -> str:
+    stack, in_string, _ = _scan(text)
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    return text + "".join(reversed(stack))
+
+
+def _loads_object(text: str) -> Optional[Dict[str, Any]]:
+    # Trailing commas are the most common slip
+    text = re.sub(r",\s*([}\]])", r"\1", text)
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def repair_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Best-effort local repair of a truncated or slightly malformed
+    JSON object: skips leading prose and fences, drops trailing text,
+    removes trailing commas, closes open strings and brackets, and
+    as a last resort cuts back to the last complete member.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    body = text[start:]
+
+    end = body.rfind("}")
+    if end != -1:
+        value = _loads_object(body[:end + 1])
+        if value is not None:
+            return value
+
+    value = _loads_object(_close(body))
+    if value is not None:
+        return value
+
+    _, _, commas = _scan(body)
+    for cut in reversed(commas):
+        value = _loads_object(_close(body[:cut]))
+        if value is not None:
+            return value
+    return None
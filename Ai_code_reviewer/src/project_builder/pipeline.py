@@ -0,0 +1,227 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from src.project_builder.formatter import ProjectFormatter
+from src.project_builder.validator import ProjectValidator
+from src.project_builder.zipper import StreamingZipWriter
+
+
+@dataclass
+class BuiltFile:
+    """
+    One planned file as it leaves the pipeline.
+    """
+    filename: str
+    content: Optional[str] = None    # formatted; None when generation failed
+    error: Optional[str] = None      # generation failure
+    problem: Optional[str] = None    # validation problem left after retries (still shipped)
+    attempts: int = 0                # regenerations it took
+
+
+class BuildPipeline:
+    """
+    Producer/consumer pipeline for generated project files:
+    generate -> format -> validate -> zip.
+
+    Producers (generator threads) hand each file over with ``put`` or
+    ``fail`` as soon as it completes and call ``close`` when done.
+    ``put`` formats (with ``formatter``, when one is given; leave it
+    out when the producer already formats, as ProjectCodeGenerator
+    does) and validates the file on the producer's thread, so checks
+    run alongside the rest of the generation and never queue behind
+    the consumer. The consumer (``run``, on the caller's thread)
+    takes the checked files in completion order and writes them to
+    the archive through a reorder buffer so members always land in
+    plan order and the archive stays reproducible.
+
+    A file that fails validation is sent back to ``regenerate(filename,
+    content, problem)`` with the problem, at most ``max_retries``
+    times; only broken files are regenerated. With the validator's
+    smoke test on, the whole project is import-tested once every file
+    is in, so archive writes wait until then.
+    """
+
+    def __init__(
+        self,
+        project_name: str,
+        order: Iterable[str],
+        writer: StreamingZipWriter,
+        formatter: Optional[ProjectFormatter] = None,
+        validator: Optional[ProjectValidator] = None,
+        regenerate: Optional[Callable[[str, str, str], str]] = None,
+        max_retries: int = 1
+    ):
+        self.project_name = project_name
+        self.order = list(order)
+        self.writer = writer
+        self.formatter = formatter
+        self.validator = validator or ProjectValidator(self.order)
+        self.regenerate = regenerate
+        self.max_retries = max_retries
+        self.files: Dict[str, str] = {}
+        self.failures: Dict[str, str] = {}
+        self.problems: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._ready: Set[str] = set()
+        self._written: Set[str] = set()
+        self._next = 0
+        self._outstanding = 0
+        self._hold_writes = self.validator.smoke_test
+
+    # --------------------------------------------------
+    # PRODUCER SIDE (any thread)
+    # --------------------------------------------------
+    def put(self, filename: str, content: str):
+        self._queue.put((filename, *self._check(filename, content), None, False))
+
+    def fail(self, filename: str, error: str):
+        self._queue.put((filename, None, None, error, False))
+
+    def _check(self, filename: str, content: str) -> Tuple[str, Optional[str]]:
+        """
+        Format and validate one file; returns (content, problem).
+        """
+        if self.formatter:
+            content = self.formatter.format_file(filename, content)
+        return content, self.validator.check_file(filename, content)
+
+    def close(self):
+        self._queue.put(None)
+
+    # --------------------------------------------------
+    # CONSUMER SIDE
+    # --------------------------------------------------
+    def run(self, on_file: Optional[Callable[[BuiltFile], None]] = None):
+        """
+        Process files until the producer has closed the pipeline and
+        every regeneration is back. ``on_file(built)`` is called once
+        per file that passed validation or ran out of retries.
+        """
+        closed = False
+        with ThreadPoolExecutor(max_workers=2) as retries:
+            while True:
+                if closed and not self._outstanding:
+                    if not self._smoke_test(retries, on_file):
+                        break
+                    continue
+
+                item = self._queue.get()
+                if item is None:
+                    closed = True
+                    continue
+                filename, content, problem, error, regenerated = item
+                if regenerated:
+                    self._outstanding -= 1
+                built = self._process(retries, filename, content, problem, error)
+                if built is not None and on_file:
+                    on_file(built)
+
+        self._hold_writes = False
+        self._flush()
+
+    def _process(
+        self,
+        retries: ThreadPoolExecutor,
+        filename: str,
+        content: Optional[str],
+        problem: Optional[str],
+        error: Optional[str]
+    ) -> Optional[BuiltFile]:
+        if content is None:
+            self.failures[filename] = error
+            self._ready.add(filename)
+            self._flush()
+            return BuiltFile(filename, error=error, attempts=self.attempts.get(filename, 0))
+
+        if problem and self._retry(retries, filename, content, problem):
+            return None
+        return self._accept(filename, content, problem)
+
+    def _accept(self, filename: str, content: str, problem: Optional[str]) -> BuiltFile:
+        self.files[filename] = content
+        if problem:
+            self.problems[filename] = problem
+        else:
+            self.problems.pop(filename, None)
+
+        if filename in self.order:
+            self._ready.add(filename)
+        self._flush()
+        return BuiltFile(filename, content, problem=problem, attempts=self.attempts.get(filename, 0))
+
+    def _retry(self, retries: ThreadPoolExecutor, filename: str, content: str, problem: str) -> bool:
+        """
+        Queue a regeneration with the problem fed back, if the budget
+        allows; its result comes back through the queue.
+        """
+        if self.regenerate is None or self.attempts.get(filename, 0) >= self.max_retries:
+            return False
+        self.attempts[filename] = self.attempts.get(filename, 0) + 1
+        self._outstanding += 1
+
+        def run():
+            try:
+                fixed = self.regenerate(filename, content, problem)
+            except Exception:
+                # Keep the broken version; it is re-checked like any other
+                fixed = content
+            try:
+                checked = self._check(filename, fixed)
+            except Exception as e:
+                # The consumer is waiting for this file: never drop it
+                checked = (fixed, f"validation failed: {e}")
+            self._queue.put((filename, *checked, None, True))
+
+        retries.submit(run)
+        return True
+
+    def _smoke_test(self, retries: ThreadPoolExecutor, on_file) -> bool:
+        """
+        Import-test the finished project; returns True when broken
+        files were sent back for regeneration.
+        """
+        if not self.validator.smoke_test:
+            return False
+        sent = False
+        for filename, problem in self.validator.run_smoke_test(self.files).items():
+            if self._retry(retries, filename, self.files[filename], problem):
+                sent = True
+            elif self.problems.get(filename) != problem:
+                self.problems[filename] = problem
+                if on_file:
+                    on_file(BuiltFile(
+                        filename, self.files[filename], problem=problem,
+                        attempts=self.attempts.get(filename, 0)
+                    ))
+        return sent
+
+    def _flush(self):
+        """
+        Write every file whose predecessors in the plan are done.
+        """
+        if self._hold_writes:
+            return
+        while self._next < len(self.order) and self.order[self._next] in self._ready:
+            filename = self.order[self._next]
+            self._ready.discard(filename)
+            if filename in self.files:
+                self._write(filename)
+            self._next += 1
+        # Files outside the plan have no place to wait for
+        for filename in [f for f in self.files if f not in self.order]:
+            self._write(filename)
+
+    def _write(self, filename: str):
+        if filename not in self._written:
+            self._written.add(filename)
+            self.writer.add(f"{self.project_name}/{filename}", self.files[filename])
+
+    def ordered_files(self) -> Dict[str, str]:
+        return {
+            filename: self.files[filename]
+            for filename in [*self.order, *self.files]
+            if filename in self.files
+        }
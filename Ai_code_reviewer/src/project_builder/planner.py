@@ -1,4 +1,15 @@
-from typing import Dict
+from typing import Dict, List
+
+# File -> planned files whose API it uses. Together with the plan this
+# forms the generation DAG: core.py -> storage.py -> cli.py / ui.py
+# -> entry point; README.md and requirements.txt have no dependencies.
+DEPENDS_ON: Dict[str, List[str]] = {
+    "storage.py": ["core.py"],
+    "cli.py": ["core.py", "storage.py"],
+    "ui.py": ["core.py", "storage.py"],
+    "main.py": ["core.py", "storage.py", "cli.py"],
+    "app.py": ["core.py", "storage.py", "ui.py"]
+}
 
 
 class ProjectPlanner:
@@ -63,3 +74,15 @@ class ProjectPlanner:
 
 
         return plan
+
+    def create_dependencies(self, plan: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Dependency DAG over the planned files (file -> files it uses).
+        Files are generated after their dependencies and are shown
+        their signatures; files without a path between them are
+        generated in parallel.
+        """
+        return {
+            filename: [dep for dep in DEPENDS_ON.get(filename, []) if dep in plan]
+            for filename in plan
+        }
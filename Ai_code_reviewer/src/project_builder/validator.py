@@ -0,0 +1,217 @@
+import ast
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# None before Python 3.10: unknown imports are then not reported
+STDLIB_MODULES = getattr(sys, "stdlib_module_names", None)
+
+
+def parse_module(filename: str, content: str) -> Tuple[Optional[ast.Module], Optional[str]]:
+    """
+    Parse and compile one Python file; returns (tree, None), or
+    (None, problem) when it does not compile.
+    """
+    try:
+        tree = ast.parse(content, filename=filename)
+        # Compiling the tree (cheaper than compiling the source again)
+        # also catches errors the parser lets through, like "return"
+        # outside a function
+        compile(tree, filename, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return None, f"line {e.lineno}: {e.msg}"
+    return tree, None
+
+
+def iter_imports(tree: ast.Module) -> Iterator[ast.stmt]:
+    """
+    Import statements in source order. Only statement bodies are
+    searched: imports cannot hide inside expressions, and skipping
+    those is several times faster than ast.walk.
+    """
+    nodes: List[ast.AST] = list(reversed(tree.body))
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue
+        for field in ("finalbody", "orelse", "handlers", "cases", "body"):
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                nodes.extend(reversed(children))
+
+
+def module_exports(tree: ast.Module) -> Optional[Set[str]]:
+    """
+    Names defined at the top level of a module (including those under
+    top-level if/try blocks). None when the module defines a
+    ``__getattr__`` and can export anything.
+    """
+    names: Set[str] = set()
+    nodes: List[ast.stmt] = list(tree.body)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+        elif isinstance(node, (ast.If, ast.Try, ast.With)):
+            nodes.extend(getattr(node, "body", []))
+            nodes.extend(getattr(node, "orelse", []))
+            nodes.extend(getattr(node, "finalbody", []))
+            for handler in getattr(node, "handlers", []):
+                nodes.extend(handler.body)
+    return None if "__getattr__" in names else names
+
+
+class ProjectValidator:
+    """
+    Checks generated project files before they are zipped:
+
+    - syntax: every .py file must compile
+    - imports: project modules a file imports must be planned, names
+      imported from its dependencies must exist there, and anything
+      else must be standard library or listed in ``third_party``
+    - smoke test (opt-in): every module is imported in its own
+      subprocess (``python -I``, empty environment, temporary working
+      directory, no stdin) with a timeout, several at a time. This is
+      not a sandbox: generated code runs with the caller's
+      permissions, so it is off by default and only offered from the
+      command line.
+    """
+
+    def __init__(
+        self,
+        plan: Iterable[str],
+        dependencies: Optional[Dict[str, List[str]]] = None,
+        third_party: Iterable[str] = (),
+        smoke_test: bool = False,
+        timeout: float = 10.0,
+        max_workers: int = 4
+    ):
+        self.modules = {f[:-3]: f for f in plan if f.endswith(".py")}
+        self.dependencies = dependencies or {}
+        self.third_party = set(third_party)
+        self.smoke_test = smoke_test
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self._exports: Dict[str, Optional[Set[str]]] = {}
+
+    # --------------------------------------------------
+    # PER-FILE CHECKS
+    # --------------------------------------------------
+    def check_file(self, filename: str, content: str) -> Optional[str]:
+        """
+        Syntax and import checks for one file, as soon as it is
+        formatted. Dependencies are generated first, so their
+        exports are known by the time their dependents are checked.
+        """
+        if not filename.endswith(".py"):
+            return None
+        tree, problem = parse_module(filename, content)
+        if problem:
+            return problem
+
+        problem = self.check_imports(filename, tree)
+        if problem is None:
+            self._exports[filename] = module_exports(tree)
+        return problem
+
+    def check_imports(self, filename: str, tree: ast.Module) -> Optional[str]:
+        dependencies = self.dependencies.get(filename, [])
+
+        for node in iter_imports(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    problem = self._check_module(alias.name)
+                    if problem:
+                        return f"line {node.lineno}: {problem}"
+
+            elif isinstance(node, ast.ImportFrom):
+                module = node.module or ""
+                if node.level:
+                    # Project modules sit side by side, so a relative
+                    # import can only mean one of them
+                    if module and module.split(".")[0] not in self.modules:
+                        return f"line {node.lineno}: no project module {module!r}"
+                    continue
+                problem = self._check_module(module)
+                if problem:
+                    return f"line {node.lineno}: {problem}"
+
+                target = self.modules.get(module)
+                exports = self._exports.get(target) if target in dependencies else None
+                if exports is None:
+                    continue
+                missing = [a.name for a in node.names if a.name != "*" and a.name not in exports]
+                if missing:
+                    return f"line {node.lineno}: {target} does not define {', '.join(missing)}"
+        return None
+
+    def _check_module(self, module: str) -> Optional[str]:
+        top = module.split(".")[0]
+        if top in self.modules or top in self.third_party or top == "__future__":
+            return None
+        if STDLIB_MODULES is None or top in STDLIB_MODULES:
+            return None
+        allowed = sorted({*self.modules, *self.third_party})
+        return (
+            f"imports {top!r}, which is neither a project module "
+            f"({', '.join(allowed) or 'none'}), in requirements.txt nor in the standard library"
+        )
+
+    # --------------------------------------------------
+    # SMOKE TEST
+    # --------------------------------------------------
+    def run_smoke_test(self, files: Dict[str, str]) -> Dict[str, str]:
+        """
+        Import every project module in its own subprocess; returns
+        filename -> problem for the modules that fail. Modules missing
+        from this environment (third-party packages) are not counted.
+        """
+        modules = [f for f in files if f.endswith(".py")]
+        if not self.smoke_test or not modules:
+            return {}
+
+        with tempfile.TemporaryDirectory(prefix="coder_buddy_smoke_") as root:
+            for filename, content in files.items():
+                Path(root, filename).write_text(content, encoding="utf-8")
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(modules))) as pool:
+                results = pool.map(lambda f: (f, self._import_module(root, f[:-3])), modules)
+                return {filename: problem for filename, problem in results if problem}
+
+    def _import_module(self, root: str, module: str) -> Optional[str]:
+        env = {"PATH": os.environ.get("PATH", "")}
+        if "SYSTEMROOT" in os.environ:
+            env["SYSTEMROOT"] = os.environ["SYSTEMROOT"]
+
+        try:
+            result = subprocess.run(
+                [sys.executable, "-I", "-c", f"import sys; sys.path.insert(0, {root!r}); import {module}"],
+                cwd=root,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return f"importing {module} timed out after {self.timeout:g}s"
+
+        if result.returncode == 0:
+            return None
+        lines = result.stderr.strip().splitlines()
+        last = lines[-1] if lines else f"exit code {result.returncode}"
+        missing = re.match(r"ModuleNotFoundError: No module named '([\w.]+)'", last)
+        if missing and missing.group(1).split(".")[0] not in self.modules:
+            return None
+        return f"import failed: {last}"
@@ -1,6 +1,141 @@
 import zipfile
-import io
-from typing import Dict
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple, Union
+
+# Fixed member timestamp (the earliest ZIP date) for reproducible archives
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class StreamingZipWriter:
+    """
+    Writes ZIP members one at a time, as soon as each file is ready.
+
+    Without ``path`` the archive is kept in memory until it grows past
+    ``spill_threshold`` bytes, then spills to a temporary file.
+    Members smaller than ``store_below`` bytes are stored, larger ones
+    deflated. Every member gets the same fixed timestamp and
+    permissions, so identical input in identical order yields a
+    byte-identical archive.
+
+    Thread-safe: members may be added from generator threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        spill_threshold: int = 8 * 1024 * 1024,
+        store_below: int = 512,
+        compresslevel: int = 6
+    ):
+        self.path = Path(path) if path else None
+        self.spill_threshold = spill_threshold
+        self.store_below = store_below
+        self.compresslevel = compresslevel
+        self.members = 0
+        self._size = 0                # largest archive size seen so far
+        self._lock = threading.Lock()
+        self._buffer: BinaryIO = (
+            open(self.path, "w+b") if self.path
+            else tempfile.SpooledTemporaryFile(max_size=spill_threshold)
+        )
+        self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(self._buffer, "w")
+
+    # --------------------------------------------------
+    # WRITING
+    # --------------------------------------------------
+    def add(self, arcname: str, content: Union[str, bytes]):
+        data = content.encode("utf-8") if isinstance(content, str) else content
+
+        info = zipfile.ZipInfo(arcname, date_time=FIXED_DATE_TIME)
+        info.external_attr = 0o644 << 16
+        if len(data) < self.store_below:
+            info.compress_type = zipfile.ZIP_STORED
+            level = None
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+            level = self.compresslevel
+
+        with self._lock:
+            if self._zip is None:
+                raise ValueError("Cannot add to a closed ZIP archive")
+            self._zip.writestr(info, data, compresslevel=level)
+            self.members += 1
+            self._track_size()
+
+    def add_project(self, project_name: str, files: Dict[str, str]):
+        """
+        Add every file under a ``project_name/`` folder.
+        """
+        for filename, content in files.items():
+            self.add(f"{project_name}/{filename}", content)
+
+    def close(self) -> BinaryIO:
+        """
+        Write the central directory and return the archive file
+        object, rewound to the start.
+        """
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+                self._track_size()
+        self._buffer.seek(0)
+        return self._buffer
+
+    def _track_size(self):
+        # Members are appended, so the position after a write is the size
+        self._size = max(self._size, self._buffer.tell())
+
+    # --------------------------------------------------
+    # OUTPUT
+    # --------------------------------------------------
+    @property
+    def spilled(self) -> bool:
+        """
+        True once the archive lives on disk rather than in memory.
+
+        Worked out from the bytes written: SpooledTemporaryFile moves
+        to disk as soon as its size exceeds ``max_size`` (0 = never).
+        """
+        if self.path is not None:
+            return True
+        return 0 < self.spill_threshold < self._size
+
+    def save(self, path: Union[str, Path]):
+        """
+        Copy the finished archive to ``path`` in chunks.
+        """
+        source = self.close()
+        with open(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        source.seek(0)
+
+    def getvalue(self) -> bytes:
+        data = self.close().read()
+        self._buffer.seek(0)
+        return data
+
+    def discard(self):
+        """
+        Drop the archive; a partial file written to ``path`` is removed.
+        """
+        with self._lock:
+            self._zip = None
+        self._buffer.close()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "StreamingZipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
 
 
 class ProjectZipper:
@@ -8,23 +143,45 @@ class ProjectZipper:
     Creates a ZIP archive from generated project files.
     """
 
+    def __init__(self, spill_threshold: int = 8 * 1024 * 1024, store_below: int = 512):
+        self.spill_threshold = spill_threshold
+        self.store_below = store_below
+
+    def open(self, path: Optional[Union[str, Path]] = None) -> StreamingZipWriter:
+        """
+        Start a streaming archive; add members as files become ready.
+        """
+        return StreamingZipWriter(
+            path,
+            spill_threshold=self.spill_threshold,
+            store_below=self.store_below
+        )
+
     def create_zip(
         self,
         project_name: str,
         files: Dict[str, str]
-    ) -> io.BytesIO:
+    ) -> BinaryIO:
         """
-        Create an in-memory ZIP file for the project.
+        Create a ZIP file for the project.
 
         Returns:
-            BytesIO object containing ZIP data.
+            Rewound file object containing ZIP data (in memory, or a
+            temporary file for large projects).
         """
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for filename, content in files.items():
-                zip_path = f"{project_name}/{filename}"
-                zipf.writestr(zip_path, content)
+        writer = self.open()
+        writer.add_project(project_name, files)
+        return writer.close()
 
-        zip_buffer.seek(0)
-        return zip_buffer
+    def create_bundle(
+        self,
+        projects: Iterable[Tuple[str, Dict[str, str]]],
+        path: Optional[Union[str, Path]] = None
+    ) -> BinaryIO:
+        """
+        Bundle several projects into one archive, one folder each.
+        """
+        writer = self.open(path)
+        for project_name, files in projects:
+            writer.add_project(project_name, files)
+        return writer.close()
@@ -47,6 +47,61 @@ Python Code:
 {code}
 """
 
+# ==================================================
+# CHUNKED CODE REVIEW (MAP / REDUCE)
+# ==================================================
+
+def build_chunk_review_prompt(chunks: list) -> str:
+    """
+    Build prompt for reviewing a batch of parts of a large module.
+
+    Parts carry names but no line numbers, so the prompt for an
+    unchanged batch stays identical when code elsewhere moves.
+    """
+    parts = "\n\n".join(f"### {chunk['name']}\n{chunk['source']}" for chunk in chunks)
+    return f"""
+Review the following parts of a larger Python module. Names used but not
+defined here are defined elsewhere in the module.
+
+Tasks:
+1. Identify bugs, code quality issues and bad practices
+2. Suggest concrete improvements in readability and structure
+
+Constraints:
+- Do NOT change the original logic
+- One bullet per finding, starting with the part name in backticks
+- Show only the changed lines of a fix, never a whole part
+- Write "No issues." for a part without findings
+
+Parts:
+{parts}
+"""
+
+
+def build_review_reduce_prompt(findings: list, lines: int) -> str:
+    """
+    Build prompt for merging per-batch review findings.
+
+    Only the findings are sent, not the code, so this call stays cheap.
+    """
+    merged = "\n\n".join(findings)
+    return f"""
+Merge the following review findings for one Python module ({lines} lines,
+reviewed in parts) into a single code review.
+
+Tasks:
+1. Remove duplicate findings
+2. Group findings into bugs, code quality issues and readability improvements
+3. End with a short overall summary of the module
+
+Constraints:
+- Keep every distinct finding and its suggested fix
+- Do NOT add findings that are not listed
+
+Findings:
+{merged}
+"""
+
 # ==================================================
 # CODE GENERATION (CODE ONLY)
 # ==================================================
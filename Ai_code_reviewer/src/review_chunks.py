@@ -0,0 +1,69 @@
+import hashlib
+from typing import Any, Dict, List
+
+from src.analyzer import CodeAnalyzer
+from src.incremental import split_segments
+
+# Code above this many (estimated) tokens is reviewed in chunks
+CHUNKED_REVIEW_TOKENS = 3000
+# Token budget of one map request's code
+BATCH_TOKENS = 1500
+# On average a batch closes after this many chunks (content-defined)
+BOUNDARY_EVERY = 4
+
+
+def estimate_tokens(text: str) -> int:
+    # Same ~4 characters per token as the scheduler's budgeting
+    return len(text) // 4 + 1
+
+
+def split_review_chunks(code: str, max_tokens: int = BATCH_TOKENS) -> List[Dict[str, Any]]:
+    """
+    Top-level functions, classes and statement runs of a module (see
+    CodeAnalyzer.top_level_chunks), with classes over the budget split
+    per method. Code that does not parse is split on definition lines
+    instead, each chunk named after its first line.
+    """
+    chunks = CodeAnalyzer(code).top_level_chunks(max_chars=max_tokens * 4)
+    if chunks:
+        return chunks
+    return [
+        {"name": (source.strip().splitlines() or ["<blank>"])[0][:80], "line": start, "source": source}
+        for start, source in split_segments(code)
+    ]
+
+
+def _is_boundary(chunk: Dict[str, Any]) -> bool:
+    digest = hashlib.sha256(chunk["source"].encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % BOUNDARY_EVERY == 0
+
+
+def pack_batches(chunks: List[Dict[str, Any]], max_tokens: int = BATCH_TOKENS) -> List[List[Dict[str, Any]]]:
+    """
+    Pack chunks, in order, into batches of at most ``max_tokens``
+    (a larger chunk gets a batch of its own).
+
+    Batch boundaries are content-defined: a batch closes after any
+    chunk whose hash picks it as a boundary, not only when it is full.
+    Editing one chunk therefore changes only its own batch (and at
+    most the next few up to the following boundary), so the other
+    map requests repeat exactly and are answered from the LLM cache.
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    batch: List[Dict[str, Any]] = []
+    tokens = 0
+
+    for chunk in chunks:
+        size = estimate_tokens(chunk["source"])
+        if batch and tokens + size > max_tokens:
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(chunk)
+        tokens += size
+        if _is_boundary(chunk):
+            batches.append(batch)
+            batch, tokens = [], 0
+
+    if batch:
+        batches.append(batch)
+    return batches
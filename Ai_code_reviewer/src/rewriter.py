@@ -1,64 +1,371 @@
+import ast
+import difflib
+import io
 import re
+import tokenize
+from typing import Dict, List, Optional, Set, Tuple
+
+# Short names and their more meaningful replacements
+RENAMES = {
+    "x": "value",
+    "y": "result",
+    "i": "index",
+    "n": "number",
+    "s": "total_sum"
+}
+
+Position = Tuple[int, int]
+
+
+class _Scope:
+    def __init__(self, kind: str, parent: Optional["_Scope"]):
+        self.kind = kind
+        self.parent = parent
+        self.bound: Set[str] = set()
+        self.blocked: Set[str] = set()
+        self.declared: Dict[str, str] = {}
+
+
+class _RenameCollector(ast.NodeVisitor):
+    """
+    Resolves every Name / arg occurrence of a renamable short name
+    to the scope that binds it.
+
+    A binding is not renamed when it cannot be rewritten safely:
+    import aliases, def/class names, except/match captures, class
+    attributes, names touched by global/nonlocal, or parameters that
+    callers may pass by keyword.
+    """
+
+    def __init__(self):
+        self.module = _Scope("module", None)
+        self.scope = self.module
+        self.occurrences: List[Tuple[_Scope, str, Position]] = []
+        self.keyword_names: Set[str] = set()
+
+    # ---------------- SCOPE HELPERS ----------------
+    def _push(self, kind: str) -> _Scope:
+        self.scope = _Scope(kind, self.scope)
+        return self.scope
+
+    def _pop(self):
+        self.scope = self.scope.parent
+
+    def _block(self, name: str):
+        self.scope.bound.add(name)
+        self.scope.blocked.add(name)
+
+    def resolve(self, scope: _Scope, name: str) -> Optional[_Scope]:
+        declared = scope.declared.get(name)
+        if declared == "global":
+            return self.module
+        if declared is None and name in scope.bound:
+            return scope
+
+        current = scope.parent
+        while current is not None:
+            # Class bodies are not visible from nested scopes
+            if current.kind != "class" or current is self.module:
+                if name in current.bound and current.declared.get(name) is None:
+                    return current
+            current = current.parent
+        return None
+
+    # ---------------- BINDINGS ----------------
+    def visit_Name(self, node: ast.Name):
+        if not isinstance(node.ctx, ast.Load):
+            self.scope.bound.add(node.id)
+        if node.id in RENAMES:
+            self.occurrences.append((self.scope, node.id, (node.lineno, node.col_offset)))
+
+    def visit_NamedExpr(self, node: ast.NamedExpr):
+        # The target of := binds in the nearest enclosing scope that
+        # is not a comprehension, not in the comprehension itself
+        self.visit(node.value)
+        scope = self.scope
+        while scope.kind == "comprehension":
+            scope = scope.parent
+        name = node.target.id
+        scope.bound.add(name)
+        if name in RENAMES:
+            self.occurrences.append((scope, name, (node.target.lineno, node.target.col_offset)))
+
+    def visit_arg(self, node: ast.arg):
+        self.scope.bound.add(node.arg)
+        if node.arg in RENAMES:
+            self.occurrences.append((self.scope, node.arg, (node.lineno, node.col_offset)))
+        if node.annotation is not None:
+            self.visit(node.annotation)
+
+    def visit_keyword(self, node: ast.keyword):
+        if node.arg:
+            self.keyword_names.add(node.arg)
+        self.visit(node.value)
+
+    def visit_Import(self, node: ast.AST):
+        for alias in node.names:
+            self._block((alias.asname or alias.name).split(".")[0])
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Global(self, node: ast.AST):
+        kind = "global" if isinstance(node, ast.Global) else "nonlocal"
+        for name in node.names:
+            self.scope.declared[name] = kind
+            self._block(name)
+            self.module.blocked.add(name)
+
+    visit_Nonlocal = visit_Global
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.name:
+            self._block(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node: ast.AST):
+        if node.name:
+            self._block(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node: ast.AST):
+        if node.name:
+            self._block(node.name)
+
+    def visit_MatchMapping(self, node: ast.AST):
+        if node.rest:
+            self._block(node.rest)
+        self.generic_visit(node)
+
+    # ---------------- SCOPES ----------------
+    def visit_FunctionDef(self, node: ast.AST):
+        self._block(node.name)
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d]:
+            self.visit(default)
+        if node.returns is not None:
+            self.visit(node.returns)
+
+        self._push("function")
+        for arg in node.args.posonlyargs + node.args.args + node.args.kwonlyargs:
+            self.visit(arg)
+        for arg in (node.args.vararg, node.args.kwarg):
+            if arg is not None:
+                self.visit(arg)
+        for stmt in node.body:
+            self.visit(stmt)
+        self._pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda):
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d]:
+            self.visit(default)
+        self._push("function")
+        for arg in node.args.posonlyargs + node.args.args + node.args.kwonlyargs:
+            self.visit(arg)
+        for arg in (node.args.vararg, node.args.kwarg):
+            if arg is not None:
+                self.visit(arg)
+        self.visit(node.body)
+        self._pop()
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._block(node.name)
+        for expr in node.decorator_list + node.bases + node.keywords:
+            self.visit(expr)
+        scope = self._push("class")
+        for stmt in node.body:
+            self.visit(stmt)
+        # Class attributes are reachable as obj.<name>; never rename
+        scope.blocked |= scope.bound
+        self._pop()
+
+    def visit_ListComp(self, node: ast.AST):
+        generators = node.generators
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(generators[0].iter)
+        self._push("comprehension")
+        for index, generator in enumerate(generators):
+            self.visit(generator.target)
+            if index:
+                self.visit(generator.iter)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for field in ("elt", "key", "value"):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+        self._pop()
+
+    visit_SetComp = visit_ListComp
+    visit_GeneratorExp = visit_ListComp
+    visit_DictComp = visit_ListComp
+
+
+def _source_lines(code: str) -> List[str]:
+    """
+    Split on the newlines ast and tokenize count (not every
+    str.splitlines boundary, e.g. form feeds or U+2028), keeping them.
+    """
+    return io.StringIO(code, newline="").readlines()
+
+
+def _char_column(line: str, byte_offset: int) -> int:
+    """
+    Convert an AST UTF-8 byte column to a str index.
+    """
+    if line.isascii():
+        return byte_offset
+    return len(line.encode("utf-8")[:byte_offset].decode("utf-8", errors="ignore"))
 
 
 class CodeRewriter:
     """
     Rewrites Python code using simple, safe refactoring rules.
     This does NOT change logic — only improves readability.
+
+    Renames are resolved per scope on the AST and applied in a
+    single tokenize pass, so strings, comments and attributes
+    (obj.x) are never touched.
     """
 
     def __init__(self, code: str):
         self.code = code
+        self.lines = _source_lines(code)
+        try:
+            self.tree = ast.parse(code)
+        except SyntaxError:
+            self.tree = None
 
-    def improve_variable_names(self):
+    # ---------------- RENAMES ----------------
+    def _rename_map(self) -> Dict[Position, Tuple[str, str]]:
+        """
+        Map (line, column) of each NAME token to (old, new) name.
+        Every position is checked against the token stream.
+        """
+        collector = _RenameCollector()
+        collector.visit(self.tree)
+
+        try:
+            tokens = list(tokenize.generate_tokens(iter(self.lines).__next__))
+        except (tokenize.TokenError, SyntaxError):
+            return {}
+
+        used_names = {tok.string for tok in tokens if tok.type == tokenize.NAME}
+        name_tokens = {tok.start for tok in tokens if tok.type == tokenize.NAME}
+
+        groups: Dict[Tuple[int, str], List[Position]] = {}
+        targets: Dict[Tuple[int, str], _Scope] = {}
+        unsafe: Set[Tuple[int, str]] = set()
+
+        for scope, name, (line, col) in collector.occurrences:
+            owner = collector.resolve(scope, name)
+            if owner is None:
+                continue
+            key = (id(owner), name)
+            targets[key] = owner
+            position = (line, _char_column(self.lines[line - 1], col))
+            # Names inside f-strings are not separate tokens (< 3.12);
+            # global/nonlocal statements would keep the old name
+            if position not in name_tokens or name in scope.declared:
+                unsafe.add(key)
+            groups.setdefault(key, []).append(position)
+
+        renames: Dict[Position, Tuple[str, str]] = {}
+        for key, positions in groups.items():
+            owner, name = targets[key], key[1]
+            new_name = RENAMES[name]
+            if key in unsafe or name in owner.blocked or new_name in used_names:
+                continue
+            if owner.kind == "function" and name in collector.keyword_names:
+                continue
+            for position in positions:
+                renames[position] = (name, new_name)
+
+        return renames
+
+    def improve_variable_names(self) -> str:
         """
         Replace common single-letter variables with meaningful names
         """
-        replacements = {
-            r"\bx\b": "value",
-            r"\by\b": "result",
-            r"\bi\b": "index",
-            r"\bn\b": "number",
-            r"\bs\b": "total_sum"
-        }
+        if self.tree is None:
+            return self.code
+
+        renames = self._rename_map()
+        if not renames:
+            return self.code
+
+        lines = list(self.lines)
+        edits: Dict[int, List[Tuple[int, str, str]]] = {}
+        for (line, col), (old_name, new_name) in renames.items():
+            edits.setdefault(line, []).append((col, old_name, new_name))
 
-        updated_code = self.code
-        for pattern, replacement in replacements.items():
-            updated_code = re.sub(pattern, replacement, updated_code)
+        for line, spans in edits.items():
+            text = lines[line - 1]
+            for col, old_name, new_name in sorted(spans, reverse=True):
+                text = text[:col] + new_name + text[col + len(old_name):]
+            lines[line - 1] = text
 
-        return updated_code
+        return "".join(lines)
 
-    def add_docstrings(self, code: str):
+    # ---------------- DOCSTRINGS ----------------
+    def add_docstrings(self, code: str) -> str:
         """
-        Add simple docstrings to functions if missing
+        Add simple docstrings to functions if missing, placed right
+        before the first body statement (decorators, multi-line
+        signatures and async defs included).
         """
-        lines = code.split("\n")
-        new_lines = []
-        i = 0
-
-        while i < len(lines):
-            line = lines[i]
-            new_lines.append(line)
-
-            if line.strip().startswith("def ") and (i + 1 < len(lines)):
-                next_line = lines[i + 1].strip()
-                if not next_line.startswith('"""'):
-                    indent = " " * (len(line) - len(line.lstrip()) + 4)
-                    new_lines.append(
-                        f'{indent}"""Auto-generated docstring."""'
-                    )
-            i += 1
-
-        return "\n".join(new_lines)
-
-    def format_spacing(self, code: str):
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return code
+
+        lines = _source_lines(code)
+        inserts: List[Tuple[int, str]] = []
+
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if ast.get_docstring(node) is not None:
+                continue
+
+            first = node.body[0]
+            anchor = min(
+                [first] + getattr(first, "decorator_list", []),
+                key=lambda n: n.lineno
+            )
+            line_text = lines[anchor.lineno - 1]
+            prefix = line_text[:_char_column(line_text, anchor.col_offset)]
+
+            # Bodies sharing a line with the signature are left alone
+            if prefix.strip() not in ("", "@"):
+                continue
+
+            indent = line_text[:len(line_text) - len(line_text.lstrip())]
+            inserts.append((anchor.lineno, f'{indent}"""Auto-generated docstring."""\n'))
+
+        if not inserts:
+            return code
+
+        inserted = dict(inserts)
+        merged = []
+        for number, line in enumerate(lines, 1):
+            if number in inserted:
+                merged.append(inserted[number])
+            merged.append(line)
+
+        return "".join(merged)
+
+    # ---------------- SPACING ----------------
+    def format_spacing(self, code: str) -> str:
         """
         Normalize spacing and remove extra blank lines
         """
         code = re.sub(r"\n{3,}", "\n\n", code)
         return code.strip()
 
-    def rewrite(self):
+    # ---------------- MAIN ENTRY ----------------
+    def rewrite(self) -> str:
         """
         Apply all rewrite rules
         """
@@ -66,3 +373,17 @@ class CodeRewriter:
         code = self.add_docstrings(code)
         code = self.format_spacing(code)
         return code
+
+    def rewrite_diff(self, context: int = 1) -> str:
+        """
+        Compact unified diff between the original and rewritten code.
+        """
+        rewritten = self.rewrite()
+        return "\n".join(difflib.unified_diff(
+            [line.rstrip("\r\n") for line in self.lines],
+            [line.rstrip("\r\n") for line in _source_lines(rewritten)],
+            fromfile="original.py",
+            tofile="rewritten.py",
+            n=context,
+            lineterm=""
+        ))
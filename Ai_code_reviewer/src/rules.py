@@ -1,75 +1,283 @@
-from typing import Dict, List
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from src.incremental import IncrementalAnalysisCache
+
+
+# ==================================================
+# FINDINGS
+# ==================================================
+SEVERITY_ICONS = {"error": "❌", "warning": "⚠️", "info": "ℹ️", "ok": "✅"}
+SEVERITY_WEIGHTS = {"error": 20, "warning": 10, "info": 5, "ok": 0}
+
+
+@dataclass(frozen=True)
+class Finding:
+    """
+    A single structured review comment.
+    """
+    rule_id: str
+    severity: str
+    message: str
+    line: Optional[int] = None
+    weight: int = 0
+
+    def render(self) -> str:
+        return f"{SEVERITY_ICONS[self.severity]} {self.message}"
+
+
+# ==================================================
+# RULE BASE + REGISTRY
+# ==================================================
+class Rule:
+    """
+    Base class for review rules.
+
+    A rule subscribes to analyzer events by listing them in
+    ``events`` and implementing the matching ``on_<event>`` handler:
+
+    - error:    one syntax error message
+    - function: one function record
+    - variable: one variable name
+    - module:   the whole analysis result (once)
+
+    Thresholds live in ``defaults`` and can be overridden per run.
+    """
+
+    rule_id = ""
+    severity = "info"
+    events: Tuple[str, ...] = ()
+    defaults: Dict[str, Any] = {}
+
+    def __init__(self, **settings):
+        self.settings = {**self.defaults, **settings}
+
+    def finding(self, message: str, line: Optional[int] = None) -> Finding:
+        return Finding(
+            rule_id=self.rule_id,
+            severity=self.severity,
+            message=message,
+            line=line,
+            weight=self.settings.get("weight", SEVERITY_WEIGHTS[self.severity])
+        )
+
+
+RULE_REGISTRY: Dict[str, Type[Rule]] = {}
+
+
+def register_rule(rule_class: Type[Rule]) -> Type[Rule]:
+    """
+    Class decorator adding a rule to the default registry.
+    Registration order is the order findings are reported in.
+    """
+    RULE_REGISTRY[rule_class.rule_id] = rule_class
+    return rule_class
+
+
+# ==================================================
+# BUILT-IN RULES
+# ==================================================
+@register_rule
+class SyntaxErrorRule(Rule):
+    rule_id = "syntax_error"
+    severity = "error"
+    events = ("error",)
+
+    def on_error(self, error: str) -> Iterable[Finding]:
+        yield self.finding(error)
+
+
+@register_rule
+class LongFunctionRule(Rule):
+    rule_id = "long_function"
+    severity = "warning"
+    events = ("function",)
+    defaults = {"max_lines": 20}
+
+    def on_function(self, func: Dict) -> Iterable[Finding]:
+        if func["length"] > self.settings["max_lines"]:
+            yield self.finding(
+                f"Function '{func['name']}' is too long "
+                f"({func['length']} lines). Consider splitting it.",
+                func.get("line")
+            )
+
+
+@register_rule
+class MissingDocstringRule(Rule):
+    rule_id = "missing_docstring"
+    severity = "info"
+    events = ("function",)
+
+    def on_function(self, func: Dict) -> Iterable[Finding]:
+        if not func["has_docstring"]:
+            yield self.finding(
+                f"Function '{func['name']}' is missing a docstring.",
+                func.get("line")
+            )
+
+
+@register_rule
+class ExcessiveLoopsRule(Rule):
+    rule_id = "excessive_loops"
+    severity = "warning"
+    events = ("module",)
+    defaults = {"max_loops": 3}
+
+    def on_module(self, analysis: Dict) -> Iterable[Finding]:
+        if analysis["loops"] > self.settings["max_loops"]:
+            yield self.finding(
+                f"Code contains {analysis['loops']} loops. "
+                "Consider optimizing nested or repeated loops."
+            )
+
+
+@register_rule
+class ShortVariableNameRule(Rule):
+    rule_id = "short_variable_name"
+    severity = "info"
+    events = ("variable",)
+    defaults = {"min_length": 2}
+
+    def on_variable(self, name: str) -> Iterable[Finding]:
+        if len(name) < self.settings["min_length"]:
+            yield self.finding(
+                f"Variable '{name}' has a very short name. "
+                "Use more descriptive variable names."
+            )
+
+
+# ==================================================
+# RULE ENGINE
+# ==================================================
+RuleConfig = Dict[str, Union[bool, Dict[str, Any]]]
 
 
 class CodeReviewRules:
     """
-    Applies code quality rules on analyzed Python code
+    Applies code quality rules on analyzed Python code.
+
+    ``config`` maps rule ids to False (disable) or a dict of
+    settings, e.g. {"long_function": {"max_lines": 40},
+    "missing_docstring": False}.
+
+    Rules subscribe to analyzer events: pass ``on_event`` to
+    CodeAnalyzer and each event is dispatched to the subscribed
+    rules as the analysis runs. An ``analysis_result`` that has
+    already been computed is replayed as events instead.
+
+    Per-function findings are memoized in the optional
+    IncrementalAnalysisCache, so unchanged functions skip the rules.
     """
 
-    def __init__(self, analysis_result: Dict):
+    def __init__(
+        self,
+        analysis_result: Optional[Dict] = None,
+        cache: Optional[IncrementalAnalysisCache] = None,
+        config: Optional[RuleConfig] = None,
+        registry: Optional[Dict[str, Type[Rule]]] = None
+    ):
         self.analysis = analysis_result
+        self.cache = cache
+        self.rules = build_rules(config, registry)
+        self.findings: List[Finding] = []
         self.comments: List[str] = []
+        self._subscribers: Dict[str, List[Rule]] = {}
+        for rule in self.rules:
+            for event in rule.events:
+                self._subscribers.setdefault(event, []).append(rule)
+        self._collected: List[Finding] = []
+        self._received = False
 
-    # ---------------- RULE: SYNTAX ERRORS ----------------
-    def check_syntax_errors(self):
-        if self.analysis["errors"]:
-            for err in self.analysis["errors"]:
-                self.comments.append(f"❌ {err}")
-
-    # ---------------- RULE: LONG FUNCTIONS ----------------
-    def check_long_functions(self, max_lines: int = 20):
-        for func in self.analysis["functions"]:
-            if func["length"] > max_lines:
-                self.comments.append(
-                    f"⚠️ Function '{func['name']}' is too long "
-                    f"({func['length']} lines). Consider splitting it."
-                )
-
-    # ---------------- RULE: MISSING DOCSTRINGS ----------------
-    def check_missing_docstrings(self):
-        for func in self.analysis["functions"]:
-            if not func["has_docstring"]:
-                self.comments.append(
-                    f"ℹ️ Function '{func['name']}' is missing a docstring."
-                )
-
-    # ---------------- RULE: TOO MANY LOOPS ----------------
-    def check_excessive_loops(self, max_loops: int = 3):
-        if self.analysis["loops"] > max_loops:
-            self.comments.append(
-                f"⚠️ Code contains {self.analysis['loops']} loops. "
-                "Consider optimizing nested or repeated loops."
-            )
+    def _function_findings(self, rule: Rule, func: Dict) -> List[Finding]:
+        if self.cache is None:
+            return list(rule.on_function(func))
+
+        params = tuple(sorted(rule.settings.items()))
+        cached = self.cache.findings(
+            rule.rule_id, func, params, lambda: list(rule.on_function(func))
+        )
+        return [replace(f, line=func.get("line")) for f in cached]
 
-    # ---------------- RULE: VARIABLE NAMING ----------------
-    def check_variable_naming(self):
-        for var in self.analysis["variables"]:
-            if len(var) == 1:
-                self.comments.append(
-                    f"ℹ️ Variable '{var}' has a very short name. "
-                    "Use more descriptive variable names."
-                )
+    # ---------------- EVENTS ----------------
+    def on_event(self, event: str, payload: Any):
+        """
+        Analyzer listener: dispatch one event to its subscribers.
+        """
+        self._received = True
+        if event == "module":
+            self.analysis = payload
+        for rule in self._subscribers.get(event, ()):
+            if event == "function":
+                self._collected.extend(self._function_findings(rule, payload))
+            else:
+                self._collected.extend(getattr(rule, f"on_{event}")(payload))
+
+    def _replay(self, analysis: Dict):
+        for err in analysis["errors"]:
+            self.on_event("error", err)
+        for func in analysis["functions"]:
+            self.on_event("function", func)
+        for var in analysis["variables"]:
+            self.on_event("variable", var)
+        self.on_event("module", analysis)
 
     # ---------------- RUN ALL RULES ----------------
-    def run_all(self) -> List[str]:
-        self.check_syntax_errors()
-        self.check_long_functions()
-        self.check_missing_docstrings()
-        self.check_excessive_loops()
-        self.check_variable_naming()
+    def run(self) -> List[Finding]:
+        """
+        Return the structured findings of the events received,
+        ordered by rule registration and then by line.
+        """
+        if not self._received and self.analysis is not None:
+            self._replay(self.analysis)
+
+        order = {rule.rule_id: index for index, rule in enumerate(self.rules)}
+        findings = sorted(self._collected, key=lambda f: (order[f.rule_id], f.line or 0))
+
+        if not findings:
+            findings.append(Finding(
+                rule_id="clean",
+                severity="ok",
+                message="No major issues found. Code looks clean!"
+            ))
 
-        if not self.comments:
-            self.comments.append("✅ No major issues found. Code looks clean!")
+        self.findings = findings
+        return findings
 
+    def run_all(self) -> List[str]:
+        """
+        Run all rules and return rendered comments.
+        """
+        self.comments = [f.render() for f in self.run()]
         return self.comments
 
 
+def build_rules(
+    config: Optional[RuleConfig] = None,
+    registry: Optional[Dict[str, Type[Rule]]] = None
+) -> List[Rule]:
+    """
+    Instantiate enabled rules from a registry with per-run settings.
+    """
+    config = config or {}
+    registry = registry if registry is not None else RULE_REGISTRY
+    rules = []
+
+    for rule_id, rule_class in registry.items():
+        settings = config.get(rule_id, True)
+        if settings is False:
+            continue
+        rules.append(rule_class(**(settings if isinstance(settings, dict) else {})))
+
+    return rules
+
+
 # ---------------- QUICK TEST ----------------
 if __name__ == "__main__":
     sample_analysis = {
         "errors": [],
         "functions": [
-            {"name": "process", "length": 35, "has_docstring": False}
+            {"name": "process", "line": 1, "length": 35, "has_docstring": False}
         ],
         "variables": ["x", "total"],
         "imports": [],
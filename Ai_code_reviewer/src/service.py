@@ -0,0 +1,486 @@
+"""
+Headless service layer for review, code generation and mini-project
+builds.
+
+Used by app.py and by cli.py; nothing on this path imports streamlit,
+so it can run from cron jobs and pipelines.
+"""
+
+import re
+import shutil
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from src.analyzer import CodeAnalyzer
+from src.cache import ReviewResultCache, get_review_cache
+from src.incremental import IncrementalAnalysisCache
+from src.rewriter import CodeRewriter
+from src.rules import CodeReviewRules, RuleConfig, build_rules
+from src.utils import calculate_quality_score
+
+# The LLM client and project-builder stack load on first use, so
+# local-only reviews never pay for them
+if TYPE_CHECKING:
+    from src.llm_reviewer import LLMCodeReviewer
+    from src.llm_scheduler import LLMScheduler
+    from src.metrics import PipelineMetrics
+    from src.project_builder.pipeline import BuiltFile
+    from src.project_builder.zipper import StreamingZipWriter
+
+TASKS = ("review", "generate", "build")
+
+
+# ==================================================
+# INPUT VALIDATION
+# ==================================================
+def is_python_request(text: str) -> bool:
+    """
+    Word-boundary safe Python-only validation.
+    """
+    text = text.lower()
+    non_python_languages = [
+        "c program", "c language", "c++",
+        "java", "javascript", "js",
+        "php", "ruby",
+        "go language", "golang",
+        "rust", "kotlin", "swift"
+    ]
+    for lang in non_python_languages:
+        if re.search(rf"\b{re.escape(lang)}\b", text):
+            return False
+    return True
+
+
+# ==================================================
+# SERVICE
+# ==================================================
+class CoderBuddyService:
+    """
+    Review, generation and build flows without any UI.
+
+    One instance can be shared across threads; each call builds its
+    own LLM client wrapper on top of the process-wide client pool,
+    scheduler and response cache.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        analysis_cache: Optional[IncrementalAnalysisCache] = None,
+        enable_cache: bool = True,
+        scheduler: Optional["LLMScheduler"] = None,
+        metrics_path: Optional[Union[str, Path]] = None,
+        rule_config: Optional[RuleConfig] = None,
+        review_cache: Optional[ReviewResultCache] = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.analysis_cache = analysis_cache or IncrementalAnalysisCache()
+        self.enable_cache = enable_cache
+        self.scheduler = scheduler
+        self.metrics_path = metrics_path
+        self.rule_config = rule_config
+        self.review_cache = (review_cache or get_review_cache()) if enable_cache else None
+        # Effective settings of every enabled rule, part of the review key
+        self._rule_settings = [[rule.rule_id, rule.settings] for rule in build_rules(rule_config)]
+
+    def llm(self, metrics: Optional["PipelineMetrics"] = None) -> "LLMCodeReviewer":
+        if not self.api_key:
+            raise ValueError("An LLM API key is required for this task.")
+        from src.llm_reviewer import LLMCodeReviewer
+
+        return LLMCodeReviewer(
+            self.api_key,
+            enable_cache=self.enable_cache,
+            base_url=self.base_url,
+            scheduler=self.scheduler,
+            metrics=metrics
+        )
+
+    # --------------------------------------------------
+    # 🔍 CODE REVIEW
+    # --------------------------------------------------
+    def review_code(self, code: str, path: str = "<input>", use_llm: bool = False) -> Dict[str, Any]:
+        """
+        Analyzer -> rules -> rewriter -> score, plus an optional
+        (blocking) LLM review.
+
+        Results are memoized in the review cache on the code and the
+        rule settings, so resubmitting the same code is one lookup.
+        """
+        key, entry = self._cached_review(code)
+        changed = entry is None
+        if entry is None:
+            entry = {"review": self._local_review(code)}
+
+        if use_llm:
+            reviewer = self.llm()
+            if entry.get("llm_model") != reviewer.model_name:
+                entry["llm_review"] = reviewer.review_code(code)
+                entry["llm_model"] = reviewer.model_name
+                changed = True
+
+        if changed and key:
+            self.review_cache.set(key, entry)
+
+        result = {"path": path, **entry["review"]}
+        if use_llm:
+            result["llm_review"] = entry["llm_review"]
+        return result
+
+    def stream_llm_review(self, code: str) -> Iterator[str]:
+        """
+        Streaming LLM review. A cached one is yielded as a single
+        chunk; a new one is added to the cached review once the
+        stream has been read to the end.
+        """
+        reviewer = self.llm()
+        key, entry = self._cached_review(code)
+        if entry is not None and entry.get("llm_model") == reviewer.model_name:
+            yield entry["llm_review"]
+            return
+
+        parts = []
+        for chunk in reviewer.stream_review_code(code):
+            parts.append(chunk)
+            yield chunk
+
+        if key and parts:
+            # Re-read: the local review may have been cached meanwhile
+            _, entry = self._cached_review(code)
+            entry = entry or {"review": self._local_review(code)}
+            entry.update(llm_review="".join(parts), llm_model=reviewer.model_name)
+            self.review_cache.set(key, entry)
+
+    def _cached_review(self, code: str):
+        if self.review_cache is None:
+            return None, None
+        key = ReviewResultCache.make_key(code, self._rule_settings)
+        return key, self.review_cache.get(key)
+
+    def _local_review(self, code: str) -> Dict[str, Any]:
+        rules = CodeReviewRules(cache=self.analysis_cache, config=self.rule_config)
+        analysis = CodeAnalyzer(code, cache=self.analysis_cache, on_event=rules.on_event).run()
+        feedback = rules.run_all()
+
+        severities: Dict[str, int] = {}
+        for finding in rules.findings:
+            severities[finding.severity] = severities.get(finding.severity, 0) + 1
+
+        return {
+            "score": calculate_quality_score(analysis, rules.findings),
+            "feedback": feedback,
+            "severities": severities,
+            "rewritten": CodeRewriter(code).rewrite(),
+            "has_errors": bool(analysis["errors"])
+        }
+
+    # --------------------------------------------------
+    # ✨ CODE GENERATION
+    # --------------------------------------------------
+    def generate_code(self, request: str) -> Dict[str, str]:
+        if not request.strip():
+            raise ValueError("Please enter a description.")
+        if not is_python_request(request):
+            raise ValueError("Only Python code is supported.")
+        code, explanation = self.llm().generate_code_with_explanation(request)
+        return {"code": code, "explanation": explanation}
+
+    # --------------------------------------------------
+    # 🧩 MINI PROJECT BUILD
+    # --------------------------------------------------
+    def build_project(
+        self,
+        prompt: str,
+        on_stage: Optional[Callable[[str], None]] = None,
+        metrics: Optional["PipelineMetrics"] = None,
+        on_file: Optional[Callable[["BuiltFile"], None]] = None,
+        smoke_test: bool = False,
+        max_retries: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Blueprint -> plan -> generate -> validate -> zip, timed per
+        stage into ``metrics``; ``on_file(built)`` sees each file as
+        it is ready, and broken files are regenerated up to
+        ``max_retries`` times (``smoke_test`` runs generated code
+        unsandboxed, so keep it to trusted callers).
+
+        Generation starts as soon as the blueprint's planning fields
+        have streamed in, and a run started from a blueprint that is
+        later replaced is cancelled before it makes further LLM calls.
+        Returns the blueprint, plan, files, problems, ZIP and timing.
+        """
+        if not prompt.strip():
+            raise ValueError("Please describe the project.")
+
+        from src.metrics import PipelineMetrics
+        from src.project_builder.blueprint import PLANNING_FIELDS, ProjectBlueprintGenerator
+        from src.project_builder.planner import ProjectPlanner
+        from src.project_builder.generator import ProjectCodeGenerator
+        from src.project_builder.pipeline import BuildPipeline
+        from src.project_builder.validator import ProjectValidator
+        from src.project_builder.zipper import ProjectZipper
+
+        metrics = metrics or PipelineMetrics("mini_project_build")
+        llm = self.llm(metrics)
+        def stage(name: str):
+            if on_stage:
+                on_stage(name)
+            return metrics.stage(name)
+
+        def start_generation(blueprint: Dict[str, Any]) -> Dict[str, Any]:
+            """
+            Plan from a partial blueprint, then generate on a background
+            thread that feeds the pipeline. Local files wait until the
+            blueprint has been completed in place and ``run["ready"]``
+            is set; setting ``run["cancel"]`` stops further LLM requests.
+            """
+            with stage("plan"):
+                planner = ProjectPlanner()
+                plan = planner.create_plan(blueprint)
+                dependencies = planner.create_dependencies(plan)
+            code_generator = ProjectCodeGenerator(self.api_key, llm=llm, metrics=metrics)
+            validator = ProjectValidator(
+                plan,
+                dependencies,
+                third_party=["streamlit"] if blueprint.get("interaction_mode") == "gui" else [],
+                smoke_test=smoke_test
+            )
+            pipeline = BuildPipeline(
+                blueprint.get("project_name", "project"),
+                plan,
+                ProjectZipper().open(),
+                validator=validator,
+                regenerate=lambda filename, content, problem: code_generator.regenerate_file(
+                    run["blueprint"], filename, plan.get(filename, ""), content, problem
+                ),
+                max_retries=max_retries
+            )
+            run: Dict[str, Any] = {
+                "blueprint": blueprint,
+                "plan": plan,
+                "dependencies": dependencies,
+                "pipeline": pipeline,
+                "ready": threading.Event(),
+                "cancel": threading.Event(),
+                "error": None
+            }
+
+            def generate():
+                try:
+                    with metrics.stage("generate"):
+                        code_generator.generate_project_code(
+                            blueprint,
+                            plan,
+                            on_file=pipeline.put,
+                            on_failure=pipeline.fail,
+                            blueprint_ready=run["ready"],
+                            dependencies=dependencies,
+                            cancel=run["cancel"]
+                        )
+                except Exception as e:
+                    run["error"] = e
+                finally:
+                    pipeline.close()
+
+            if on_stage:
+                on_stage("generate")
+            threading.Thread(target=generate, daemon=True).start()
+            return run
+
+        def abandon(run: Optional[Dict[str, Any]]):
+            # Only the consumer writes to the archive, so the generator
+            # thread can be left to finish the requests already in flight
+            if run is not None:
+                run["cancel"].set()
+                run["ready"].set()
+                run["pipeline"].writer.discard()
+
+        early: Dict[str, Any] = {}
+
+        def on_partial(fields: Dict[str, Any]):
+            early["run"] = start_generation(fields)
+
+        def on_update(fields: Dict[str, Any]):
+            # Later members (the description) reach files not started yet;
+            # planning fields stay as planned until the final check below
+            early["run"]["blueprint"].update(
+                {field: value for field, value in fields.items() if field not in PLANNING_FIELDS}
+            )
+
+        try:
+            with stage("blueprint"):
+                blueprint_generator = ProjectBlueprintGenerator(
+                    self.api_key, llm=llm, enable_cache=self.enable_cache
+                )
+                blueprint = blueprint_generator.generate_blueprint(
+                    prompt, on_partial=on_partial, on_update=on_update
+                )
+        except BaseException:
+            abandon(early.get("run"))
+            raise
+
+        run = early.get("run")
+        if run is None or any(
+            run["blueprint"].get(field) != blueprint.get(field) for field in PLANNING_FIELDS
+        ):
+            # Cache hit, or the final blueprint disagrees with the partial
+            # one: the whole blueprint is known, description included
+            abandon(run)
+            run = start_generation(dict(blueprint))
+        run["blueprint"].update(blueprint)
+        run["ready"].set()
+
+        def deliver(built: "BuiltFile"):
+            if built.content is not None:
+                metrics.mark("first_file")
+            if on_file:
+                on_file(built)
+
+        pipeline = run["pipeline"]
+        try:
+            pipeline.run(deliver)
+            if run["error"] is not None:
+                raise run["error"]
+            with stage("zip"):
+                zip_data = pipeline.writer.close()
+        except BaseException:
+            abandon(run)
+            raise
+
+        return {
+            "blueprint": blueprint,
+            "plan": run["plan"],
+            "dependencies": run["dependencies"],
+            "files": pipeline.ordered_files(),
+            "failures": dict(pipeline.failures),
+            "problems": dict(pipeline.problems),
+            "regenerated": dict(pipeline.attempts),
+            "zip_data": zip_data,
+            "timing": metrics.write(self.metrics_path),
+            "blueprint_cache": self._blueprint_cache_report(blueprint_generator)
+        }
+
+    @staticmethod
+    def _blueprint_cache_report(generator) -> Dict[str, Any]:
+        report = {
+            "hit": generator.last_cache_hit,
+            "saved_seconds": round(generator.last_saved_seconds, 3)
+        }
+        if generator.cache is not None:
+            stats = generator.cache.stats()
+            report["hit_rate"] = stats["hit_rate"]
+            report["total_saved_seconds"] = stats["shared_saved_seconds"]
+        return report
+
+    # --------------------------------------------------
+    # 📦 BATCH JOBS
+    # --------------------------------------------------
+    def run_job(
+        self,
+        job: Dict[str, Any],
+        zip_dir: Optional[Path] = None,
+        bundle: Optional["StreamingZipWriter"] = None
+    ) -> Dict[str, Any]:
+        """
+        Run one batch job and return a JSON-serialisable result.
+
+        Jobs are dicts with a ``task`` ("review", "generate" or
+        "build") and either ``code`` / ``path`` (review) or
+        ``prompt`` (generate, build). An optional ``id`` is echoed.
+        Built projects are saved to ``zip_dir`` and/or added to the
+        shared ``bundle`` archive.
+        """
+        task = job.get("task")
+        output: Dict[str, Any] = {"id": job.get("id"), "task": task}
+
+        if task == "review":
+            if "code" in job:
+                path, code = job.get("path", "<input>"), job["code"]
+            elif "path" in job:
+                path = job["path"]
+                code = Path(path).read_text(encoding="utf-8", errors="replace")
+            else:
+                raise ValueError("review jobs need 'code' or 'path'")
+            output.update(self.review_code(code, path, use_llm=bool(job.get("llm"))))
+
+        elif task == "generate":
+            output.update(self.generate_code(job.get("prompt", "")))
+
+        elif task == "build":
+            build = self.build_project(
+                job.get("prompt", ""),
+                smoke_test=bool(job.get("smoke_test", False)),
+                max_retries=int(job.get("max_retries", 1))
+            )
+            name = build["blueprint"]["project_name"]
+            output.update({
+                "project_name": name,
+                "interaction_mode": build["blueprint"].get("interaction_mode"),
+                "files": list(build["files"]),
+                "failures": build["failures"],
+                "problems": build["problems"],
+                "regenerated": build["regenerated"],
+                "timing": build["timing"],
+                "blueprint_cache": build["blueprint_cache"]
+            })
+            folder = f"{name}-{job['id']}" if job.get("id") is not None else name
+            if zip_dir is not None:
+                zip_path = Path(zip_dir) / f"{folder}.zip"
+                with open(zip_path, "wb") as f:
+                    shutil.copyfileobj(build["zip_data"], f)
+                output["zip_path"] = str(zip_path)
+            if bundle is not None:
+                bundle.add_project(folder, build["files"])
+                output["bundle_folder"] = folder
+            build["zip_data"].close()
+
+        else:
+            raise ValueError(f"Unknown task {task!r}; expected one of {', '.join(TASKS)}")
+
+        return output
+
+    def run_batch(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        max_workers: int = 4,
+        zip_dir: Optional[Path] = None,
+        bundle: Optional["StreamingZipWriter"] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run jobs on a thread pool with at most ``2 * max_workers`` in
+        flight, yielding results in completion order. Failed jobs
+        yield ``{"id", "task", "error"}`` instead of raising.
+
+        With a ``bundle`` writer every built project is streamed into
+        one multi-project archive as it completes.
+        """
+        jobs = iter(jobs)
+        max_workers = max(1, max_workers)
+        if zip_dir is not None:
+            Path(zip_dir).mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {}
+
+            def fill():
+                while len(pending) < max_workers * 2:
+                    try:
+                        job = next(jobs)
+                    except StopIteration:
+                        return
+                    pending[pool.submit(self.run_job, job, zip_dir, bundle)] = job
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield {"id": job.get("id"), "task": job.get("task"), "error": str(e)}
+                fill()
@@ -0,0 +1,30 @@
+import os
+from pathlib import Path
+
+
+# ---------------- DATA DIRECTORY ----------------
+def get_data_dir() -> Path:
+    """
+    Directory for local caches and stores.
+
+    Defaults to ~/.cache/coder_buddy and can be overridden with
+    the CODER_BUDDY_HOME environment variable.
+    """
+    base = os.environ.get("CODER_BUDDY_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache", "coder_buddy"
+    )
+    path = Path(base)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# ---------------- QUALITY SCORE ----------------
+def calculate_quality_score(analysis, findings):
+    """
+    Single pass over structured findings (see src.rules.Finding):
+    100 minus each finding's weight, minus 5 per loop.
+    """
+    score = 100 - analysis["loops"] * 5
+    for finding in findings:
+        score -= finding.weight
+    return max(score, 0)